@@ -0,0 +1,2 @@
+"""Páginas de la app. Cada módulo expone `mostrar()` y se importa la primera
+vez que se visita la página, con sus dependencias."""
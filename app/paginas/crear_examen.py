@@ -0,0 +1,194 @@
+from datetime import datetime
+
+import streamlit as st
+
+from evaluapp.busqueda import paginar
+from evaluapp.metricas import metricas
+from evaluapp.repositorio import obtener_repositorio
+from servicios import get_preguntas, obtener_profesor_existente, post_data
+
+PREGUNTAS_POR_PAGINA = 20
+
+
+def _reiniciar_pagina():
+    st.session_state.pagina_preguntas = 0
+
+
+def _cambiar_pagina(delta):
+    st.session_state.pagina_preguntas = st.session_state.get("pagina_preguntas", 0) + delta
+
+
+def _alternar_pregunta(pregunta_id):
+    # La selección se guarda aparte de las casillas, que solo existen mientras
+    # su página está a la vista
+    seleccion = st.session_state.preguntas_seleccionadas
+    if st.session_state[f"pregunta_{pregunta_id}"]:
+        if pregunta_id not in seleccion:
+            seleccion.append(pregunta_id)
+    elif pregunta_id in seleccion:
+        seleccion.remove(pregunta_id)
+
+
+def _limpiar_seleccion():
+    st.session_state.preguntas_seleccionadas = []
+    for clave in [c for c in st.session_state if str(c).startswith("pregunta_")]:
+        del st.session_state[clave]
+
+
+def selector_preguntas(repositorio):
+    # Buscador paginado sobre el índice de texto: solo se dibujan las
+    # preguntas de la página visible, no el banco entero
+    st.subheader("Preguntas")
+    if not repositorio.preguntas:
+        st.warning("No hay preguntas disponibles en el sistema")
+        return
+    
+    col_texto, col_tipo = st.columns([3, 1])
+    texto = col_texto.text_input("Buscar por texto", key="buscar_preguntas", on_change=_reiniciar_pagina)
+    tipo = col_tipo.selectbox("Tipo", ["Todos"] + repositorio.indice.tipos, key="tipo_preguntas",
+                              on_change=_reiniciar_pagina)
+    
+    encontradas = repositorio.indice.buscar(texto, None if tipo == "Todos" else tipo)
+    visibles, pagina, total_paginas = paginar(encontradas, st.session_state.get("pagina_preguntas", 0),
+                                              PREGUNTAS_POR_PAGINA)
+    st.session_state.pagina_preguntas = pagina
+    st.caption(f"{len(encontradas)} preguntas encontradas, página {pagina + 1} de {total_paginas}")
+    
+    seleccion = st.session_state.preguntas_seleccionadas
+    for pregunta in visibles:
+        st.checkbox(
+            pregunta.get("textoPregunta", f"Pregunta {pregunta['id']}"),
+            value=pregunta["id"] in seleccion,
+            key=f"pregunta_{pregunta['id']}",
+            on_change=_alternar_pregunta,
+            args=(pregunta["id"],),
+        )
+    
+    anterior, siguiente, limpiar = st.columns([1, 1, 2])
+    anterior.button("Anterior", disabled=pagina == 0, on_click=_cambiar_pagina, args=(-1,))
+    siguiente.button("Siguiente", disabled=pagina + 1 >= total_paginas, on_click=_cambiar_pagina, args=(1,))
+    limpiar.button("Quitar selección", disabled=not seleccion, on_click=_limpiar_seleccion)
+
+
+def mostrar():
+    st.title("Crear Nuevo Examen")
+    
+    # Obtener profesor existente o usar uno por defecto
+    with metricas.seccion("crear/profesor"):
+        profesor_id = obtener_profesor_existente()
+    
+    if not profesor_id:
+        st.info("No se pudo obtener un profesor existente")
+        st.info("Usando un ID de profesor por defecto...")
+        # Usar un ID numérico por defecto
+        profesor_id = 1  # ID por defecto que debería existir
+    
+    # Mostrar el profesor seleccionado
+    st.info(f"Usando profesor con ID: {profesor_id}")
+    
+    # No necesitamos mostrar el selectbox si ya tenemos un profesor
+    # profesor_id = st.selectbox(
+    #     "Selecciona el profesor que crea el examen",
+    #     options=[p["id"] for p in profesores],
+    #     format_func=lambda x: next((f"{p['name']} {p['lastName']}" for p in profesores if p["id"] == x), "Profesor")
+    # )
+    
+    if not profesor_id:
+        st.error("Debes seleccionar un profesor")
+        st.stop()
+    
+    # Obtener preguntas; el índice de búsqueda se reutiliza mientras no cambie la descarga
+    with metricas.seccion("crear/preguntas"):
+        preguntas = get_preguntas()
+        repositorio = obtener_repositorio(preguntas=preguntas)
+    
+    if 'preguntas_seleccionadas' not in st.session_state:
+        st.session_state.preguntas_seleccionadas = []
+    
+    # El selector va fuera del formulario para que buscar y paginar respondan
+    # al momento (dentro de un st.form nada se actualiza hasta enviarlo)
+    with metricas.seccion("crear/selector"):
+        selector_preguntas(repositorio)
+    
+    # Formulario para crear examen
+    with st.form("crear_examen"):
+        titulo = st.text_input("Título del examen", "")
+        descripcion = st.text_area("Descripción", "")
+        fecha_inicio = st.date_input("Fecha de inicio", datetime.now())
+        fecha_fin = st.date_input("Fecha de fin", datetime.now())
+        
+        preguntas_seleccionadas = list(st.session_state.preguntas_seleccionadas)
+        st.write(f"Preguntas seleccionadas: {len(preguntas_seleccionadas)}")
+        
+        submitted = st.form_submit_button("Crear Examen")
+        if submitted:
+            try:
+                # Validar campos requeridos
+                if not titulo.strip():
+                    st.error("El título del examen es requerido")
+                    st.stop()
+                
+                if fecha_fin <= fecha_inicio:
+                    st.error("La fecha de fin debe ser posterior a la fecha de inicio")
+                    st.stop()
+                
+                if not preguntas_seleccionadas:
+                    st.error("Debes seleccionar al menos una pregunta")
+                    st.stop()
+                
+                # Verificar que las preguntas seleccionadas existen
+                preguntas_validas = []
+                for pregunta_id in preguntas_seleccionadas:
+                    pregunta = repositorio.pregunta(pregunta_id)
+                    if pregunta:
+                        preguntas_validas.append(pregunta)
+                    else:
+                        st.error(f"Pregunta no válida: {pregunta_id}")
+                
+                if not preguntas_validas:
+                    st.error("No se encontraron preguntas válidas")
+                    st.stop()
+                
+                # Mostrar las preguntas seleccionadas
+                st.subheader("Preguntas seleccionadas:")
+                for pregunta in preguntas_validas:
+                    st.write(f"- {pregunta['textoPregunta']}")
+                
+                # Validar datos antes de enviar
+                if not profesor_id:
+                    st.error("Debes seleccionar un profesor")
+                    st.stop()
+                
+                examen_data = {
+                    "titulo": titulo,
+                    "descripcion": descripcion,
+                    "fechaInicio": fecha_inicio.isoformat(),
+                    "fechaFin": fecha_fin.isoformat(),
+                    "preguntasIds": [int(p) for p in preguntas_seleccionadas],  # Convertir a enteros
+                    "creadorId": profesor_id
+                }
+                
+                # Usar el profesor existente
+                try:
+                    examen_data["creadorId"] = int(profesor_id)  # Convertir a entero
+                except ValueError:
+                    st.error("El ID del profesor debe ser un número")
+                    st.stop()
+                
+                try:
+                    result = post_data("examenes", examen_data)
+                    st.success(f"Examen creado exitosamente!")
+                    _limpiar_seleccion()
+                    st.info("Redirigiendo a la página de inicio...")
+                    page = "Inicio"
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error al crear el examen: {str(e)}")
+                    st.info("Por favor, verifique:")
+                    st.info("1. Que el servidor esté corriendo")
+                    st.info("2. Que las fechas sean válidas")
+                    st.info("3. Que las preguntas seleccionadas existan")
+                    st.info("4. Que el título no esté vacío")
+                    st.info("5. Que el profesor seleccionado sea válido")
+            except Exception as e:
+                st.error(f"Error inesperado: {str(e)}")
@@ -0,0 +1,36 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+
+from evaluapp.metricas import metricas
+from servicios import contar
+
+
+def mostrar():
+    st.title("Bienvenido a Evaluapp")
+    st.write("Esta aplicación te permite crear exámenes, realizarlos y analizar los resultados.")
+    
+    # Mostrar estadísticas rápidas: los tres conteos se piden en paralelo y
+    # cada métrica se pinta en cuanto llega su respuesta
+    col1, col2, col3 = st.columns(3)
+    tarjetas = {
+        "examenes": ("Exámenes", col1.empty()),
+        "preguntas": ("Preguntas", col2.empty()),
+        "resultados": ("Resultados", col3.empty()),
+    }
+    for etiqueta, espacio in tarjetas.values():
+        espacio.metric(etiqueta, "…")
+    
+    with metricas.seccion("inicio/conteos"), ThreadPoolExecutor(max_workers=len(tarjetas)) as executor:
+        # Cada hilo hereda el contexto del rerun para anotar sus métricas en él
+        futuros = {executor.submit(contextvars.copy_context().run, contar, endpoint): endpoint
+                   for endpoint in tarjetas}
+        for futuro in as_completed(futuros):
+            endpoint = futuros[futuro]
+            etiqueta, espacio = tarjetas[endpoint]
+            try:
+                espacio.metric(etiqueta, futuro.result())
+            except Exception as e:
+                espacio.metric(etiqueta, "—")
+                st.error(f"Error al contar {endpoint}: {str(e)}")
@@ -0,0 +1,197 @@
+import streamlit as st
+
+from evaluapp.borradores import nuevo_borrador
+from evaluapp.metricas import metricas
+from evaluapp.repositorio import obtener_repositorio
+from servicios import borradores, cola, get_examenes, get_paquete, mostrar_envios
+
+# Segundos entre guardados automáticos de las respuestas
+INTERVALO_AUTOGUARDADO = 5
+
+
+def id_borrador():
+    # El borrador se identifica en la URL para recuperar las respuestas al recargar
+    borrador = st.query_params.get("borrador")
+    if not borrador:
+        borrador = nuevo_borrador()
+        st.query_params["borrador"] = borrador
+    return borrador
+
+
+def respuestas_examen(examen_id):
+    # Respuestas {pregunta_id: opcion_id} de un examen. La primera vez en la
+    # sesión se recuperan del borrador guardado, si lo hay.
+    por_examen = st.session_state.setdefault("respuestas_por_examen", {})
+    guardadas = st.session_state.setdefault("respuestas_guardadas", {})
+    if examen_id not in por_examen:
+        por_examen[examen_id] = borradores.cargar(id_borrador(), examen_id)
+        guardadas[examen_id] = dict(por_examen[examen_id])
+    return por_examen[examen_id]
+
+
+def _registrar_respuesta(examen_id, pregunta_id, clave):
+    respuestas = respuestas_examen(examen_id)
+    if st.session_state[clave] is None:
+        respuestas.pop(pregunta_id, None)
+    else:
+        respuestas[pregunta_id] = st.session_state[clave]
+
+
+@st.experimental_fragment
+def pregunta_examen(examen_id, pregunta, opciones):
+    # Cada pregunta es un fragmento: al elegir una opción solo se vuelve a
+    # ejecutar este bloque, no la página entera
+    etiquetas = {o["id"]: f"{i}. {o['textoOpcion']}" for i, o in enumerate(opciones, 1)}
+    clave = f"respuesta_{examen_id}_{pregunta['id']}"
+    # Streamlit olvida el valor de los widgets que no se dibujan (al cambiar
+    # de examen o de página): se restaura desde las respuestas guardadas
+    elegida = respuestas_examen(examen_id).get(pregunta["id"])
+    if clave not in st.session_state and elegida in etiquetas:
+        st.session_state[clave] = elegida
+
+    st.markdown("---")
+    st.subheader(pregunta["textoPregunta"])
+    st.radio(
+        pregunta["textoPregunta"],
+        options=list(etiquetas),
+        format_func=etiquetas.get,
+        index=None,
+        key=clave,
+        label_visibility="collapsed",
+        on_change=_registrar_respuesta,
+        args=(examen_id, pregunta["id"], clave),
+    )
+
+
+@st.experimental_fragment(run_every=INTERVALO_AUTOGUARDADO)
+def autoguardado(examen_id, paquete, total):
+    # Guarda el borrador si cambió desde el último guardado y muestra el progreso
+    respuestas = respuestas_examen(examen_id)
+    guardadas = st.session_state.respuestas_guardadas
+    if respuestas != guardadas.get(examen_id):
+        with metricas.seccion("realizar/autoguardado"):
+            borradores.guardar(id_borrador(), examen_id, respuestas)
+        guardadas[examen_id] = dict(respuestas)
+
+    st.caption(f"Respondidas {len(respuestas)} de {total}. Las respuestas se guardan automáticamente.")
+    with st.expander("Respuestas seleccionadas"):
+        for pregunta_id, respuesta_id in respuestas.items():
+            pregunta = paquete.pregunta(pregunta_id)
+            respuesta = paquete.opcion(pregunta_id, respuesta_id)
+            if pregunta and respuesta:
+                st.write(f"- {pregunta['textoPregunta']}: {respuesta['textoOpcion']}")
+
+
+def mostrar():
+    st.title("Realizar Examen")
+    
+    # Selección de examen
+    with metricas.seccion("realizar/datos"):
+        examenes = get_examenes()
+        repositorio = obtener_repositorio(examenes)
+    examen_id = st.selectbox(
+        "Selecciona un examen",
+        options=[e["id"] for e in examenes],
+        format_func=lambda x: (repositorio.examen(x) or {}).get("titulo", "")
+    )
+    
+    if examen_id:
+        try:
+            # Convertir examen_id a entero
+            examen_id = int(examen_id)
+            
+            # Buscar el examen
+            examen = repositorio.examen(examen_id)
+            if not examen:
+                st.error(f"Examen con ID {examen_id} no encontrado")
+                st.stop()
+            
+            st.subheader(examen["titulo"])
+            st.write(examen["descripcion"])
+            
+            # Respuestas de este examen, separadas de las de otros exámenes
+            respuestas = respuestas_examen(examen_id)
+            
+            # Preguntas y opciones del examen en un solo paquete, compartido
+            # por todas las sesiones
+            with metricas.seccion("realizar/paquete"):
+                paquete = get_paquete(examen)
+            if paquete is None:
+                st.stop()
+            
+            # Verificar si hay preguntas asignadas
+            if examen["preguntasIds"]:
+                
+                # Mostrar cada pregunta y sus opciones
+                for pregunta_id in examen["preguntasIds"]:
+                    try:
+                        # Convertir a entero y asegurarnos que es un número válido
+                        pregunta_id = int(pregunta_id)
+                        
+                        # Buscar la pregunta por ID
+                        pregunta = paquete.pregunta(pregunta_id)
+                        
+                        if pregunta:
+                            # Obtener opciones de la pregunta
+                            opciones = pregunta["opciones"]
+                            if not opciones:
+                                st.error(f"No se encontraron opciones para la pregunta: {pregunta['textoPregunta']}")
+                                continue
+                            
+                            # Mostrar la pregunta con sus opciones
+                            pregunta_examen(examen_id, pregunta, opciones)
+                        else:
+                            st.error(f"Pregunta con ID {pregunta_id} no encontrada en la base de datos")
+                            continue
+                    except ValueError:
+                        st.error(f"ID de pregunta inválido: {pregunta_id}")
+                        continue
+                    except Exception as e:
+                        st.error(f"Error al procesar la pregunta {pregunta_id}: {str(e)}")
+                        continue
+            else:
+                st.warning("Este examen no tiene preguntas asignadas. ¿Te gustaría crear una nueva?")
+                if st.button("Crear nuevo examen", key="crear_examen_btn"):
+                    page = "Crear Examen"
+                    st.rerun()
+                st.stop()
+            
+            # Progreso y guardado periódico del borrador
+            st.markdown("---")
+            autoguardado(examen_id, paquete, len(examen["preguntasIds"]))
+            
+            # Botón para enviar el examen
+            if st.button("Enviar Examen", key="enviar_examen_btn"):
+                if not respuestas:
+                    st.error("No se han respondido preguntas")
+                    st.stop()
+                
+                # Mostrar resumen antes de enviar
+                st.write("Resumen de respuestas a enviar:")
+                for pregunta_id, respuesta_id in respuestas.items():
+                    pregunta = paquete.pregunta(pregunta_id)
+                    respuesta = paquete.opcion(pregunta_id, respuesta_id)
+                    if pregunta and respuesta:
+                        st.write(f"- {pregunta['textoPregunta']}: {respuesta['textoOpcion']}")
+                
+                resultado_data = {
+                    "examenId": examen_id,  # Ya convertido antes
+                    "respuestas": dict(respuestas)
+                }
+                
+                # Las respuestas se guardan en la cola local antes de enviarlas:
+                # si el servidor falla se reintentan sin perderlas
+                try:
+                    clave = cola.encolar("resultados", resultado_data)
+                    st.session_state.setdefault("envios", []).append(clave)
+                    # Ya está a salvo en la cola: el borrador deja de hacer falta
+                    borradores.borrar(id_borrador(), examen_id)
+                    st.session_state.respuestas_guardadas[examen_id] = dict(respuestas)
+                    st.success("Respuestas guardadas. Se enviarán al servidor en segundo plano.")
+                except Exception as e:
+                    st.error(f"Error al guardar las respuestas: {str(e)}")
+            
+            mostrar_envios(st.session_state.get("envios", []))
+        except StopIteration:
+            st.error("Examen no encontrado")
+            st.stop()
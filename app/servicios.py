@@ -0,0 +1,202 @@
+"""Acceso a la API compartido por las páginas de la app.
+
+Se importa una sola vez por proceso: el cliente HTTP, la caché y la cola de
+envíos sobreviven a los reruns y se comparten entre sesiones.
+"""
+import json
+from datetime import datetime
+
+import requests
+import streamlit as st
+
+from evaluapp.borradores import obtener_borradores
+from evaluapp.cache import cache_api
+from evaluapp.cliente import obtener_cliente
+from evaluapp.envios import CONFIRMADO, FALLIDO, obtener_cola
+from evaluapp.metricas import metricas
+from evaluapp.normalizacion import describir, normalizar_respuesta
+from evaluapp.paquetes import ErrorPaquete, obtener_paquetes
+from evaluapp.referencia import obtener_refrescador
+
+# Cliente HTTP compartido (pool de conexiones, timeouts y reintentos)
+cliente = obtener_cliente()
+
+# Cola persistente de envíos de resultados, vaciada en segundo plano
+cola = obtener_cola()
+
+# Exámenes, preguntas y profesores: copia en memoria revalidada en segundo plano
+referencia = obtener_refrescador()
+
+# Paquetes de examen (preguntas y opciones) en memoria y en disco
+paquetes = obtener_paquetes()
+
+# Respuestas de los exámenes en curso, guardadas periódicamente en disco
+borradores = obtener_borradores()
+
+def get_data(endpoint, params=None):
+    # Las colecciones de referencia se sirven al instante desde su copia en
+    # memoria, aunque esté algo vencida: el hilo de fondo la revalida
+    if params is None and referencia.gestiona(endpoint):
+        metricas.registrar_cache(endpoint, referencia.colecciones[endpoint].datos is not None)
+        try:
+            return referencia.obtener(endpoint)
+        except Exception as e:
+            st.error(f"Error al obtener datos de {endpoint}: {str(e)}")
+            return []
+    # El resto se sirve desde la caché compartida mientras no venza
+    encontrado, data = cache_api.obtener(endpoint, params)
+    if cache_api.cacheable(endpoint):
+        metricas.registrar_cache(endpoint, encontrado)
+    if encontrado:
+        return data
+    try:
+        response = cliente.get(endpoint, params=params)
+        if response.status_code == 200:
+            # Validar y convertir los registros; null se trata como lista vacía
+            data, invalidos = normalizar_respuesta(endpoint, response.json())
+            avisar_invalidos(endpoint, invalidos)
+            # Solo se cachean las respuestas correctas, nunca los errores
+            cache_api.guardar(endpoint, data, params)
+            return data
+        else:
+            st.error(f"Error {response.status_code} al obtener datos de {endpoint}")
+            return []
+    except Exception as e:
+        st.error(f"Error al obtener datos de {endpoint}: {str(e)}")
+        return []
+
+def avisar_invalidos(endpoint, invalidos):
+    if invalidos:
+        detalle = "; ".join(describir(i) for i in invalidos[:3])
+        st.warning(f"Se descartaron {len(invalidos)} registros no válidos de {endpoint}: {detalle}")
+
+def post_data(endpoint, data):
+    try:
+        response = cliente.post(endpoint, json=data)
+        if response.status_code in (200, 201):
+            # La colección cambió: descartar la copia cacheada
+            cache_api.invalidar(endpoint.split("?")[0].split("/")[0])
+            referencia.invalidar(endpoint.split("?")[0].split("/")[0])
+            return response.json()
+        else:
+            try:
+                # Intentar obtener más detalles del error
+                error_data = response.json()
+                error_message = error_data.get('message', 'Error desconocido')
+                error_detail = error_data.get('detail', 'Sin detalles')
+                raise Exception(f"Error {response.status_code}: {error_message}\nDetalles: {error_detail}")
+            except json.JSONDecodeError:
+                # Si no es JSON, mostrar el texto de la respuesta
+                error_text = response.text[:200]  # Mostrar los primeros 200 caracteres
+                raise Exception(f"Error {response.status_code}: Respuesta no válida\nRespuesta del servidor: {error_text}")
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Error de conexión: {str(e)}")
+
+def get_examenes():
+    # get_data ya valida los exámenes: preguntasIds siempre es una lista de enteros
+    examenes = get_data("examenes")
+    return examenes if isinstance(examenes, list) else []
+
+def get_preguntas():
+    preguntas = get_data("preguntas")
+    return preguntas
+
+def get_resultados():
+    return get_data("resultados")
+
+def contar(endpoint):
+    # Solo el número de elementos, sin descargar ni guardar la colección
+    # completa. No usa `st`, así que se puede llamar desde otros hilos.
+    encontrado, total = cache_api.obtener(endpoint, {"conteo": True})
+    if encontrado:
+        metricas.registrar_cache(endpoint, True)
+        return total
+    if referencia.gestiona(endpoint) and referencia.colecciones[endpoint].datos is not None:
+        metricas.registrar_cache(endpoint, True)
+        return len(referencia.colecciones[endpoint].datos)
+    # Si la colección completa ya está en caché basta con medirla
+    encontrado, data = cache_api.obtener(endpoint)
+    metricas.registrar_cache(endpoint, encontrado)
+    if encontrado:
+        return len(data)
+    total = cliente.contar(endpoint)
+    cache_api.guardar(endpoint, total, {"conteo": True})
+    return total
+
+def get_opciones(preguntas_ids):
+    # Devuelve un mapa pregunta_id -> opciones. Las que no están en caché se
+    # piden todas a la vez en paralelo en lugar de una petición por pregunta.
+    opciones_por_pregunta = {}
+    pendientes = []
+    for pregunta_id in preguntas_ids:
+        encontrado, opciones = cache_api.obtener("opciones", {"pregunta_id": pregunta_id})
+        metricas.registrar_cache("opciones", encontrado)
+        if encontrado:
+            opciones_por_pregunta[pregunta_id] = opciones
+        else:
+            pendientes.append(pregunta_id)
+    
+    respuestas = cliente.get_varios([("opciones", {"pregunta_id": pregunta_id}) for pregunta_id in pendientes])
+    for pregunta_id, response in zip(pendientes, respuestas):
+        opciones_por_pregunta[pregunta_id] = []
+        if isinstance(response, Exception):
+            st.error(f"Error al obtener opciones de la pregunta {pregunta_id}: {str(response)}")
+            continue
+        if response.status_code != 200:
+            st.error(f"Error {response.status_code} al obtener opciones de la pregunta {pregunta_id}")
+            continue
+        try:
+            opciones, invalidos = normalizar_respuesta("opciones", response.json())
+        except ValueError as e:
+            st.error(f"Respuesta no válida para las opciones de la pregunta {pregunta_id}: {str(e)}")
+            continue
+        avisar_invalidos(f"las opciones de la pregunta {pregunta_id}", invalidos)
+        cache_api.guardar("opciones", opciones, {"pregunta_id": pregunta_id})
+        opciones_por_pregunta[pregunta_id] = opciones
+    return opciones_por_pregunta
+
+def get_paquete(examen):
+    # Paquete con las preguntas del examen en orden y sus opciones; se
+    # descarga una sola vez por examen para todas las sesiones
+    try:
+        paquete, origen = paquetes.obtener(examen)
+    except (ErrorPaquete, requests.exceptions.RequestException) as e:
+        st.error(f"Error al obtener las preguntas del examen: {str(e)}")
+        return None
+    metricas.registrar_cache("paquetes", origen != "api")
+    return paquete
+
+def get_profesores():
+    try:
+        profesores = get_data("teacher/profile")
+        return profesores
+    except Exception as e:
+        st.error(f"Error al obtener profesores: {str(e)}")
+        return []
+
+def obtener_profesor_existente():
+    # Perfil de teacher desde la copia de referencia: no espera a la red
+    # salvo la primera vez
+    profesores = get_profesores()
+    if profesores:
+        return profesores[0]["id"]  # Usamos el primer profesor disponible
+    st.error("Error al obtener profesor existente: no hay profesores registrados")
+    return None
+
+def mostrar_envios(claves):
+    # Estado en la cola de los exámenes enviados en esta sesión
+    if not claves:
+        return
+    st.write("Envíos de esta sesión:")
+    for envio in cola.estados(claves).values():
+        if envio is None:
+            continue
+        hora = datetime.fromtimestamp(envio["creado_en"]).strftime("%H:%M:%S")
+        if envio["estado"] == CONFIRMADO:
+            st.success(f"{hora}: confirmado por el servidor")
+        elif envio["estado"] == FALLIDO:
+            st.error(f"{hora}: no se pudo enviar ({envio['ultimo_error']})")
+        else:
+            detalle = f", {envio['intentos']} intentos fallidos" if envio["intentos"] else ""
+            st.info(f"{hora}: pendiente de envío{detalle}")
+    st.button("Actualizar estado", key="actualizar_envios_btn")
@@ -0,0 +1,86 @@
+"""Tiempo de arranque en frío de la app y de los scripts.
+
+Cada medición se hace en un proceso nuevo de Python, que es lo que paga cada
+contenedor de Streamlit al escalar. Además del tiempo se comprueba que no se
+hayan cargado dependencias pesadas que el punto de entrada no necesita.
+
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --repeticiones 10
+
+Termina con código 1 si algún punto de entrada supera su objetivo.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("pandas", "numpy", "matplotlib")
+
+# nombre -> (código que se importa/ejecuta, objetivo en ms, módulos que no debe cargar)
+ARRANQUES = {
+    "app: página de inicio": (
+        "import sys; sys.path[:0] = [{raiz!r}, {raiz!r} + '/app']\n"
+        "import streamlit, evaluapp.metricas, servicios, paginas.inicio",
+        700, PESADOS,
+    ),
+    "app: realizar examen": (
+        "import sys; sys.path[:0] = [{raiz!r}, {raiz!r} + '/app']\n"
+        "import streamlit, evaluapp.metricas, servicios, paginas.realizar_examen",
+        700, PESADOS,
+    ),
+    "reportes.py --help": (
+        "import sys; sys.path[:0] = [{raiz!r} + '/script']; sys.argv = ['reportes.py', '--help']\n"
+        "import reportes\n"
+        "try:\n    reportes.main()\nexcept SystemExit:\n    pass",
+        400, PESADOS,
+    ),
+    "analizar_puntuacion.py (import)": (
+        "import sys; sys.path[:0] = [{raiz!r} + '/script']\n"
+        "import analizar_puntuacion",
+        400, PESADOS,
+    ),
+}
+
+# Se imprime tras el código medido para saber qué módulos se cargaron
+_INFORME = "\nimport sys as _s; print(','.join(m for m in {pesados!r} if m in _s.modules))"
+
+
+def medir(codigo, repeticiones):
+    tiempos = []
+    cargados = ""
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        proceso = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True)
+        tiempos.append(time.perf_counter() - inicio)
+        if proceso.returncode != 0:
+            raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+        cargados = proceso.stdout.strip().splitlines()[-1] if proceso.stdout.strip() else ""
+    return min(tiempos), [m for m in cargados.split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de Evaluapp")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    # Referencia: un intérprete vacío
+    base, _ = medir("pass" + _INFORME.format(pesados=PESADOS), args.repeticiones)
+    print(f"Intérprete vacío: {base * 1000:.0f} ms\n")
+
+    fallos = 0
+    for nombre, (codigo, objetivo, prohibidos) in ARRANQUES.items():
+        segundos, cargados = medir(codigo.format(raiz=RAIZ) + _INFORME.format(pesados=PESADOS),
+                                   args.repeticiones)
+        sobrantes = [m for m in cargados if m in prohibidos]
+        ok = segundos * 1000 <= objetivo and not sobrantes
+        fallos += not ok
+        detalle = f"  carga {', '.join(sobrantes)}" if sobrantes else ""
+        print(f"{'ok ' if ok else 'MAL'} {nombre:<34} {segundos * 1000:7.0f} ms "
+              f"(objetivo {objetivo} ms){detalle}")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
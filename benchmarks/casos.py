@@ -0,0 +1,142 @@
+"""Casos de benchmark sobre las rutas calientes de la app y los scripts.
+
+Cada caso prepara su entrada fuera de la medición (con datos sintéticos del
+tamaño pedido) y ejecuta solo la operación a medir.
+"""
+import json
+
+import pandas as pd
+
+from evaluapp.cliente import ClienteAPI, iterar_arreglo_json
+from evaluapp.normalizacion import normalizar_respuesta
+from evaluapp.puntuacion import calcular
+from evaluapp.servidor_local import iniciar_en_segundo_plano, url_base
+from evaluapp.tablas import tabla_resultados
+
+PREGUNTAS_POR_ITEM = 10
+OPCIONES_POR_PREGUNTA = 4
+EXAMENES_DISJUNTOS = 160
+
+
+class Caso:
+    def __init__(self, nombre, descripcion, preparar, ejecutar, max_tamano=None, terminar=None):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.preparar = preparar    # tamano -> entrada (se llama antes de cada repetición)
+        self.ejecutar = ejecutar    # entrada -> resultado (lo único que se mide)
+        self.max_tamano = max_tamano
+        self.terminar = terminar    # libera recursos al acabar el caso
+
+
+# Constructores de datos: registros deterministas con la forma de la API
+
+def examenes_crudos(n):
+    # Tal como llegan del backend: ids en texto
+    return [{
+        "id": str(i),
+        "titulo": f"Examen {i}",
+        "descripcion": "Descripción del examen",
+        "preguntasIds": [str(i * PREGUNTAS_POR_ITEM + k) for k in range(PREGUNTAS_POR_ITEM)],
+        "creadorId": "1",
+    } for i in range(n)]
+
+
+def resultados_crudos(n):
+    return [{
+        "id": i,
+        "puntaje": (i * 7) % 101,
+        "fecha": "2024-05-01T10:00:00",
+        "usuario": {"id": i % 500, "email": f"usuario{i % 500}@evaluapp.test"},
+        "examen": {"id": i % 40, "titulo": f"Examen {i % 40}"},
+        "respuestas": {str(k): k * OPCIONES_POR_PREGUNTA + (i + k) % OPCIONES_POR_PREGUNTA
+                       for k in range(PREGUNTAS_POR_ITEM)},
+    } for i in range(n)]
+
+
+def resultados_disjuntos(n):
+    # Cada examen tiene sus propias preguntas: el conjunto completo abarca
+    # EXAMENES_DISJUNTOS * PREGUNTAS_POR_ITEM preguntas distintas, pero cada
+    # intento solo responde las de su examen
+    resultados = resultados_crudos(n)
+    for i, resultado in enumerate(resultados):
+        examen = i % EXAMENES_DISJUNTOS
+        primera = examen * PREGUNTAS_POR_ITEM
+        resultado["examen"] = {"id": examen, "titulo": f"Examen {examen}"}
+        resultado["respuestas"] = {str(primera + k): (primera + k) * OPCIONES_POR_PREGUNTA
+                                   + (i + k) % OPCIONES_POR_PREGUNTA for k in range(PREGUNTAS_POR_ITEM)}
+    return resultados
+
+
+def opciones_tabla(preguntas=PREGUNTAS_POR_ITEM):
+    n = preguntas * OPCIONES_POR_PREGUNTA
+    return pd.DataFrame({
+        "id": range(n),
+        "pregunta_id": [i // OPCIONES_POR_PREGUNTA for i in range(n)],
+        "esCorrecta": [i % OPCIONES_POR_PREGUNTA == 0 for i in range(n)],
+    })
+
+
+def _fragmentos(texto, tamano=64 * 1024):
+    return [texto[i:i + tamano] for i in range(0, len(texto), tamano)]
+
+
+# Casos de red: comparten un servidor local con latencia artificial
+
+_servidor = {}
+
+
+def _cliente_local():
+    if "cliente" not in _servidor:
+        servidor = iniciar_en_segundo_plano(latencia=0.005, examenes=1, preguntas=1000,
+                                            resultados=0, usuarios=10)
+        _servidor["servidor"] = servidor
+        _servidor["cliente"] = ClienteAPI(url_base(servidor), tamano_pool=16)
+    return _servidor["cliente"]
+
+
+def _cerrar_servidor():
+    if "servidor" in _servidor:
+        _servidor.pop("cliente").cerrar()
+        servidor = _servidor.pop("servidor")
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def _opciones_secuencial(n):
+    cliente = _cliente_local()
+    return [cliente.get(f"opciones/pregunta/{i}") for i in range(1, n + 1)]
+
+
+def _opciones_concurrente(n):
+    cliente = _cliente_local()
+    return cliente.get_varios([(f"opciones/pregunta/{i}", None) for i in range(1, n + 1)])
+
+
+CASOS = [
+    Caso("normalizar_ids", "get_data: validación por esquema de exámenes con ids en texto",
+         examenes_crudos, lambda datos: normalizar_respuesta("examenes", datos)),
+    Caso("get_examenes", "get_examenes: exámenes que ya llegan con ids enteros",
+         lambda n: normalizar_respuesta("examenes", examenes_crudos(n))[0],
+         lambda datos: normalizar_respuesta("examenes", datos)),
+    Caso("json_loads_resultados", "json.loads de la lista completa de /resultados",
+         lambda n: json.dumps(resultados_crudos(n)), json.loads),
+    Caso("streaming_resultados", "parseo incremental de /resultados por fragmentos",
+         lambda n: _fragmentos(json.dumps(resultados_crudos(n))),
+         lambda fragmentos: sum(1 for _ in iterar_arreglo_json(fragmentos))),
+    Caso("json_normalize_resultados", "pd.json_normalize de los scripts de análisis",
+         resultados_crudos, lambda datos: pd.json_normalize(datos, sep=".")),
+    Caso("tabla_resultados", "tabla de resultados de los scripts, con las respuestas sin aplanar",
+         resultados_crudos, tabla_resultados),
+    Caso("puntuacion", "recalcular puntajes y análisis de ítems",
+         lambda n: (tabla_resultados(resultados_crudos(n)), opciones_tabla()),
+         lambda entrada: calcular(*entrada), max_tamano=300_000),
+    Caso("puntuacion_examenes_disjuntos",
+         f"puntuación con {EXAMENES_DISJUNTOS} exámenes de preguntas distintas",
+         lambda n: (tabla_resultados(resultados_disjuntos(n)),
+                    opciones_tabla(EXAMENES_DISJUNTOS * PREGUNTAS_POR_ITEM)),
+         lambda entrada: calcular(*entrada), max_tamano=300_000),
+    Caso("opciones_secuencial", "una petición de opciones tras otra (5 ms de latencia)",
+         lambda n: n, _opciones_secuencial, max_tamano=100, terminar=_cerrar_servidor),
+    Caso("opciones_concurrente", "opciones en paralelo con get_varios (5 ms de latencia)",
+         lambda n: n, _opciones_concurrente, max_tamano=100, terminar=_cerrar_servidor),
+]
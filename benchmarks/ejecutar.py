@@ -0,0 +1,152 @@
+"""Benchmarks reproducibles de las rutas calientes de Evaluapp.
+
+Ejemplos:
+    python benchmarks/ejecutar.py                       # todos los casos, 100 a 100k
+    python benchmarks/ejecutar.py --tamanos 100 1000000 --casos normalizar_ids get_examenes
+    python benchmarks/ejecutar.py --comparar benchmarks/resultados/a.json benchmarks/resultados/b.json
+
+Por cada caso y tamaño se mide el tiempo de pared (mínimo y mediana de varias
+repeticiones) y, en una ejecución aparte con tracemalloc, el pico de memoria,
+la memoria que queda asignada y los bloques netos reservados. Los resultados
+se guardan en JSON junto con el commit para compararlos entre versiones.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, RAIZ)
+
+from benchmarks.casos import CASOS
+
+TAMANOS = [100, 1_000, 10_000, 100_000]
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+UMBRAL_REGRESION = 1.10
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def medir(caso, tamano, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        entrada = caso.preparar(tamano)
+        gc.collect()
+        inicio = time.perf_counter()
+        caso.ejecutar(entrada)
+        tiempos.append(time.perf_counter() - inicio)
+        del entrada
+
+    # Memoria en una ejecución aparte: tracemalloc ralentiza la medición de tiempo
+    entrada = caso.preparar(tamano)
+    gc.collect()
+    bloques_antes = sys.getallocatedblocks()
+    tracemalloc.start()
+    resultado = caso.ejecutar(entrada)
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    bloques = sys.getallocatedblocks() - bloques_antes
+    del resultado, entrada
+
+    return {
+        "tiempo_min_s": min(tiempos),
+        "tiempo_mediana_s": statistics.median(tiempos),
+        "pico_memoria_bytes": pico,
+        "memoria_retenida_bytes": actual,
+        "bloques_netos": bloques,
+    }
+
+
+def ejecutar(args):
+    casos = [c for c in CASOS if not args.casos or c.nombre in args.casos]
+    informe = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones,
+        "resultados": {},
+    }
+
+    for caso in casos:
+        print(f"\n{caso.nombre}: {caso.descripcion}")
+        informe["resultados"][caso.nombre] = {}
+        try:
+            for tamano in args.tamanos:
+                if caso.max_tamano and tamano > caso.max_tamano:
+                    continue
+                medida = medir(caso, tamano, args.repeticiones)
+                informe["resultados"][caso.nombre][str(tamano)] = medida
+                print(f"  n={tamano:>9,}  {medida['tiempo_min_s'] * 1000:10.2f} ms  "
+                      f"pico {medida['pico_memoria_bytes'] / 2**20:8.1f} MiB  "
+                      f"bloques {medida['bloques_netos']:>10,}")
+        finally:
+            if caso.terminar:
+                caso.terminar()
+
+    os.makedirs(args.directorio, exist_ok=True)
+    nombre = f"{datetime.now():%Y%m%d-%H%M%S}_{informe['commit']}.json"
+    ruta = os.path.join(args.directorio, nombre)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2)
+    print(f"\nResultados guardados en {ruta}")
+
+
+def comparar(ruta_base, ruta_nueva, umbral):
+    with open(ruta_base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(ruta_nueva, encoding="utf-8") as f:
+        nueva = json.load(f)
+
+    print(f"Base: {base['commit']} ({base['fecha']})  Nueva: {nueva['commit']} ({nueva['fecha']})")
+    print(f"{'caso':<28}{'n':>10}{'base ms':>12}{'nueva ms':>12}{'ratio':>8}{'pico MiB':>12}")
+    regresiones = 0
+    for caso, tamanos in nueva["resultados"].items():
+        for tamano, medida in tamanos.items():
+            anterior = base["resultados"].get(caso, {}).get(tamano)
+            if anterior is None:
+                continue
+            ratio = medida["tiempo_min_s"] / anterior["tiempo_min_s"] if anterior["tiempo_min_s"] else float("inf")
+            marca = "  <-- regresión" if ratio > umbral else ""
+            regresiones += bool(marca)
+            print(f"{caso:<28}{int(tamano):>10,}{anterior['tiempo_min_s'] * 1000:>12.2f}"
+                  f"{medida['tiempo_min_s'] * 1000:>12.2f}{ratio:>8.2f}"
+                  f"{medida['pico_memoria_bytes'] / 2**20:>12.1f}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de Evaluapp")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS,
+                        help="número de registros de cada carga (p. ej. 100 1000000)")
+    parser.add_argument("--casos", nargs="+", choices=[c.nombre for c in CASOS])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--directorio", default=DIRECTORIO_RESULTADOS)
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVA"),
+                        help="comparar dos archivos de resultados en lugar de medir")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="ratio de tiempo a partir del cual se marca una regresión")
+    args = parser.parse_args()
+
+    if args.comparar:
+        regresiones = comparar(*args.comparar, args.umbral)
+        sys.exit(1 if regresiones else 0)
+    ejecutar(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Módulos compartidos entre la aplicación Streamlit y los scripts de análisis."""
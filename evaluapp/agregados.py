@@ -0,0 +1,206 @@
+"""Agregados incrementales de puntajes por examen y por usuario.
+
+En lugar de recorrer todos los resultados en cada análisis se guarda un punto
+de control con, por grupo, el número de resultados, la suma y la suma de
+cuadrados de los puntajes, el mínimo, el máximo y un histograma de intervalos
+fijos. Todo ello se combina sumando, así que basta con agregar los resultados
+con id mayor que el último procesado y sumarlos a lo guardado.
+
+El histograma hace de resumen de cuantiles: con intervalos de 1 punto sobre
+0-100 la mediana o el p90 tienen un error de medio punto como mucho, y dos
+histogramas se combinan exactamente, sin importar el orden de los lotes.
+
+Cada fuente de datos (la API, los snapshots de un directorio) tiene su
+propio punto de control.
+
+Se asume que los resultados solo se añaden (ids crecientes). Si se editan o
+borran resultados antiguos hay que recalcular desde cero.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+from datetime import datetime, timezone
+
+from evaluapp.snapshots import DIRECTORIO
+
+# Ruta base de los puntos de control; cada fuente de datos guarda el suyo
+# junto a ella (ver ruta_origen)
+RUTA = os.environ.get("EVALUAPP_AGREGADOS", os.path.join(DIRECTORIO, "agregados_resultados.json"))
+
+VERSION = 1
+
+# Intervalos del histograma de puntajes; los valores fuera de rango van al
+# primer o último intervalo (el mínimo y el máximo se guardan aparte)
+PUNTAJE_MINIMO = 0.0
+PUNTAJE_MAXIMO = 100.0
+ANCHO_INTERVALO = 1.0
+
+# nombre del agregado -> columna de los resultados por la que se agrupa
+AGRUPACIONES = {"examen": "examen.titulo", "usuario": "usuario.email"}
+
+
+def ruta_origen(ruta, origen):
+    # Punto de control de `origen` junto a `ruta`: un archivo por fuente, para
+    # que alternar la API y los snapshots no descarte cada vez los agregados
+    # de la otra. El nombre lleva parte del origen legible y un hash del todo.
+    base, extension = os.path.splitext(ruta)
+    legible = re.sub(r"[^0-9A-Za-z]+", "_", origen or "").strip("_")[-40:] or "sin_origen"
+    huella = hashlib.sha256((origen or "").encode("utf-8")).hexdigest()[:8]
+    return f"{base}_{legible}_{huella}{extension or '.json'}"
+
+
+class Estadistica:
+    # Resumen combinable de los puntajes de un grupo
+    def __init__(self, n=0, suma=0.0, suma_cuadrados=0.0, minimo=None, maximo=None, histograma=None):
+        self.n = n
+        self.suma = suma
+        self.suma_cuadrados = suma_cuadrados
+        self.minimo = minimo
+        self.maximo = maximo
+        self.histograma = histograma or {}  # intervalo -> n
+
+    def combinar(self, otra):
+        self.n += otra.n
+        self.suma += otra.suma
+        self.suma_cuadrados += otra.suma_cuadrados
+        self.minimo = otra.minimo if self.minimo is None else min(self.minimo, otra.minimo)
+        self.maximo = otra.maximo if self.maximo is None else max(self.maximo, otra.maximo)
+        for intervalo, n in otra.histograma.items():
+            self.histograma[intervalo] = self.histograma.get(intervalo, 0) + n
+
+    @property
+    def media(self):
+        return self.suma / self.n if self.n else None
+
+    @property
+    def desviacion(self):
+        if not self.n:
+            return None
+        varianza = self.suma_cuadrados / self.n - self.media ** 2
+        return math.sqrt(max(0.0, varianza))
+
+    def cuantil(self, q):
+        # Centro del intervalo donde cae el cuantil q (0-1), acotado a [mínimo, máximo]
+        if not self.n:
+            return None
+        objetivo = q * self.n
+        acumulado = 0
+        for intervalo in sorted(self.histograma):
+            acumulado += self.histograma[intervalo]
+            if acumulado >= objetivo:
+                valor = PUNTAJE_MINIMO + intervalo * ANCHO_INTERVALO
+                return min(max(valor, self.minimo), self.maximo)
+        return self.maximo
+
+    def a_dict(self):
+        return {
+            "n": self.n, "suma": self.suma, "suma_cuadrados": self.suma_cuadrados,
+            "minimo": self.minimo, "maximo": self.maximo,
+            "histograma": {str(k): v for k, v in sorted(self.histograma.items())},
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(datos["n"], datos["suma"], datos["suma_cuadrados"], datos["minimo"], datos["maximo"],
+                   {int(k): v for k, v in datos["histograma"].items()})
+
+
+class AgregadosResultados:
+    def __init__(self, origen=None):
+        self.origen = origen
+        self.ultimo_id = None
+        self.procesados = 0
+        self.actualizado_en = None
+        self.grupos = {nombre: {} for nombre in AGRUPACIONES}  # nombre -> grupo -> Estadistica
+
+    def agregar_lote(self, lote, desde_id=None):
+        # Suma al estado los resultados del lote con id mayor que `desde_id`.
+        # Devuelve cuántos se agregaron.
+        import pandas as pd
+        if desde_id is not None and "id" in lote.columns:
+            # Con ids nulos (Int64) la comparación da <NA>: esas filas se descartan
+            lote = lote[(lote["id"] > desde_id).fillna(False).astype(bool)]
+        if lote.empty:
+            return 0
+
+        puntaje = pd.to_numeric(lote["puntaje"], errors="coerce")
+        intervalo = ((puntaje.clip(PUNTAJE_MINIMO, PUNTAJE_MAXIMO) - PUNTAJE_MINIMO) / ANCHO_INTERVALO).round()
+        for nombre, columna in AGRUPACIONES.items():
+            datos = pd.DataFrame({"grupo": lote[columna], "puntaje": puntaje,
+                                  "cuadrado": puntaje ** 2, "intervalo": intervalo}).dropna()
+            if datos.empty:
+                continue
+            # observed=True: con columnas categóricas, solo los grupos presentes en el lote
+            por_grupo = datos.groupby("grupo", observed=True)
+            resumen = por_grupo["puntaje"].agg(["count", "sum", "min", "max"])
+            resumen["cuadrados"] = por_grupo["cuadrado"].sum()
+            histogramas = {}
+            for (grupo, i), n in datos.groupby(["grupo", datos["intervalo"].astype(int)],
+                                                   observed=True).size().items():
+                histogramas.setdefault(grupo, {})[i] = int(n)
+
+            estadisticas = self.grupos[nombre]
+            for grupo, fila in resumen.iterrows():
+                parcial = Estadistica(int(fila["count"]), float(fila["sum"]), float(fila["cuadrados"]),
+                                      float(fila["min"]), float(fila["max"]), histogramas[grupo])
+                if grupo in estadisticas:
+                    estadisticas[grupo].combinar(parcial)
+                else:
+                    estadisticas[grupo] = parcial
+
+        if "id" in lote.columns:
+            maximo = pd.to_numeric(lote["id"], errors="coerce").max()
+            if pd.notna(maximo):
+                self.ultimo_id = max(int(maximo), self.ultimo_id or 0)
+        self.procesados += len(lote)
+        return len(lote)
+
+    def medias(self, nombre):
+        return {grupo: e.media for grupo, e in self.grupos[nombre].items()}
+
+    # Punto de control
+
+    def a_dict(self):
+        return {
+            "version": VERSION,
+            "origen": self.origen,
+            "ultimo_id": self.ultimo_id,
+            "procesados": self.procesados,
+            "actualizado_en": self.actualizado_en,
+            "grupos": {nombre: {grupo: e.a_dict() for grupo, e in estadisticas.items()}
+                       for nombre, estadisticas in self.grupos.items()},
+        }
+
+    def guardar(self, ruta=RUTA):
+        self.actualizado_en = datetime.now(timezone.utc).isoformat()
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        # Escribir a un temporal y renombrar para no dejar el punto de control a medias
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.a_dict(), f, ensure_ascii=False)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta=RUTA, origen=None):
+        # Estado guardado para `origen`, o uno vacío si no existe, es de otra
+        # versión o se calculó sobre otra fuente de datos
+        agregados = cls(origen)
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return agregados
+        # Sin último id no se sabe qué resultados faltan: se recalcula todo
+        if datos.get("version") != VERSION or datos.get("origen") != origen or datos.get("ultimo_id") is None:
+            return agregados
+        agregados.ultimo_id = datos["ultimo_id"]
+        agregados.procesados = datos["procesados"]
+        agregados.actualizado_en = datos.get("actualizado_en")
+        for nombre in AGRUPACIONES:
+            agregados.grupos[nombre] = {grupo: Estadistica.desde_dict(e)
+                                        for grupo, e in datos["grupos"].get(nombre, {}).items()}
+        return agregados
@@ -0,0 +1,89 @@
+"""Borradores de exámenes en curso guardados en SQLite.
+
+Mientras un estudiante responde, la app guarda cada pocos segundos sus
+respuestas por examen. Si se recarga la página o se reinicia el servidor, las
+respuestas se recuperan con el identificador del borrador (que la app guarda
+en la URL). Al enviar el examen el borrador se borra.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+RUTA = os.environ.get(
+    "EVALUAPP_BORRADORES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cola", "borradores.sqlite3"),
+)
+
+# Los borradores sin cambios durante más de una semana se descartan
+CADUCIDAD = 7 * 24 * 3600
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS borradores (
+    borrador TEXT NOT NULL,
+    examen_id INTEGER NOT NULL,
+    respuestas TEXT NOT NULL,
+    actualizado_en REAL NOT NULL,
+    PRIMARY KEY (borrador, examen_id)
+);
+"""
+
+
+def nuevo_borrador():
+    return uuid.uuid4().hex
+
+
+class AlmacenBorradores:
+    def __init__(self, ruta=RUTA, caducidad=CADUCIDAD):
+        self.ruta = ruta
+        self.caducidad = caducidad
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with self._conexion() as conexion:
+            conexion.executescript(_ESQUEMA)
+            conexion.execute("DELETE FROM borradores WHERE actualizado_en < ?", (time.time() - caducidad,))
+
+    def _conexion(self):
+        # Una conexión por operación, como en la cola de envíos
+        conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        return closing(conexion)
+
+    def guardar(self, borrador, examen_id, respuestas):
+        with self._conexion() as conexion:
+            conexion.execute(
+                "INSERT OR REPLACE INTO borradores (borrador, examen_id, respuestas, actualizado_en)"
+                " VALUES (?, ?, ?, ?)",
+                (borrador, examen_id, json.dumps({str(p): o for p, o in respuestas.items()}), time.time()),
+            )
+
+    def cargar(self, borrador, examen_id):
+        # Respuestas guardadas {pregunta_id: opcion_id}, o {} si no hay borrador
+        with self._conexion() as conexion:
+            fila = conexion.execute("SELECT respuestas FROM borradores WHERE borrador = ? AND examen_id = ?",
+                                    (borrador, examen_id)).fetchone()
+        if fila is None:
+            return {}
+        return {int(p): o for p, o in json.loads(fila[0]).items()}
+
+    def borrar(self, borrador, examen_id):
+        with self._conexion() as conexion:
+            conexion.execute("DELETE FROM borradores WHERE borrador = ? AND examen_id = ?", (borrador, examen_id))
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+
+def obtener_borradores():
+    # Almacén único por proceso, compartido por todas las sesiones
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                _almacen = AlmacenBorradores()
+    return _almacen
@@ -0,0 +1,74 @@
+"""Búsqueda de preguntas por texto y tipo con un índice invertido en memoria.
+
+Cada palabra de `textoPregunta` (en minúsculas y sin tildes) apunta al
+conjunto de preguntas que la contienen, y cada `tipoPregunta` al suyo. Una
+búsqueda intersecta esos conjuntos en lugar de recorrer todo el banco, y las
+palabras de la consulta se tratan como prefijos para poder buscar mientras
+se escribe.
+"""
+import bisect
+import re
+import unicodedata
+from collections import defaultdict
+
+_PALABRA = re.compile(r"\w+")
+
+
+def normalizar_texto(texto):
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def palabras(texto):
+    return _PALABRA.findall(normalizar_texto(texto))
+
+
+class IndicePreguntas:
+    def __init__(self, preguntas):
+        self.preguntas = list(preguntas)
+        self._por_palabra = defaultdict(set)  # palabra -> posiciones en self.preguntas
+        self._por_tipo = defaultdict(set)     # tipoPregunta -> posiciones
+        for posicion, pregunta in enumerate(self.preguntas):
+            for palabra in palabras(pregunta.get("textoPregunta")):
+                self._por_palabra[palabra].add(posicion)
+            tipo = pregunta.get("tipoPregunta")
+            if tipo:
+                self._por_tipo[tipo].add(posicion)
+        self._vocabulario = sorted(self._por_palabra)
+
+    @property
+    def tipos(self):
+        return sorted(self._por_tipo)
+
+    def _con_prefijo(self, prefijo):
+        # Unión de las preguntas de todas las palabras que empiezan por `prefijo`
+        inicio = bisect.bisect_left(self._vocabulario, prefijo)
+        posiciones = set()
+        for palabra in self._vocabulario[inicio:]:
+            if not palabra.startswith(prefijo):
+                break
+            posiciones |= self._por_palabra[palabra]
+        return posiciones
+
+    def buscar(self, texto="", tipo=None):
+        # Preguntas que contienen todas las palabras de `texto` (como prefijo)
+        # y son del tipo indicado, en el orden original del banco
+        conjuntos = [self._con_prefijo(p) for p in dict.fromkeys(palabras(texto))]
+        if tipo:
+            conjuntos.append(self._por_tipo.get(tipo, set()))
+        if not conjuntos:
+            return self.preguntas
+        conjuntos.sort(key=len)
+        posiciones = set(conjuntos[0])
+        for conjunto in conjuntos[1:]:
+            posiciones &= conjunto
+            if not posiciones:
+                break
+        return [self.preguntas[p] for p in sorted(posiciones)]
+
+
+def paginar(elementos, pagina, tamano):
+    # Devuelve (elementos de la página, página efectiva, número de páginas)
+    total_paginas = max(1, -(-len(elementos) // tamano))
+    pagina = min(max(0, pagina), total_paginas - 1)
+    return elementos[pagina * tamano:(pagina + 1) * tamano], pagina, total_paginas
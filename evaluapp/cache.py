@@ -0,0 +1,70 @@
+"""Caché en memoria con expiración (TTL) y desalojo LRU.
+
+Vive a nivel de módulo, así que se comparte entre todas las sesiones de
+Streamlit del mismo proceso y sobrevive a cada rerun del script.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Segundos que se considera válida cada colección. Los endpoints que no
+# aparecen aquí no se cachean.
+TTL_POR_ENDPOINT = {
+    "examenes": 60,
+    "preguntas": 300,
+    "opciones": 300,
+    "resultados": 30,
+}
+MAX_ENTRADAS = 2048
+
+
+class CacheTTL:
+    def __init__(self, ttl_por_endpoint=None, max_entradas=MAX_ENTRADAS):
+        self.ttl_por_endpoint = dict(ttl_por_endpoint or {})
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()  # clave -> (expira_en, valor)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(endpoint, params=None):
+        return (endpoint, tuple(sorted((params or {}).items())))
+
+    def cacheable(self, endpoint):
+        return endpoint in self.ttl_por_endpoint
+
+    def obtener(self, endpoint, params=None):
+        # Devuelve (encontrado, valor); una entrada vencida cuenta como fallo
+        clave = self.clave(endpoint, params)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return False, None
+            expira_en, valor = entrada
+            if expira_en < time.monotonic():
+                del self._entradas[clave]
+                return False, None
+            self._entradas.move_to_end(clave)
+            return True, valor
+
+    def guardar(self, endpoint, valor, params=None):
+        ttl = self.ttl_por_endpoint.get(endpoint)
+        if ttl is None:
+            return
+        clave = self.clave(endpoint, params)
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, endpoint=None):
+        # Sin endpoint se vacía toda la caché
+        with self._lock:
+            if endpoint is None:
+                self._entradas.clear()
+                return
+            for clave in [c for c in self._entradas if c[0] == endpoint]:
+                del self._entradas[clave]
+
+
+cache_api = CacheTTL(TTL_POR_ENDPOINT)
@@ -0,0 +1,301 @@
+"""Cliente HTTP compartido para la API de Evaluapp.
+
+Mantiene una única sesión de `requests` con pool de conexiones keep-alive,
+tiempos de espera, reintentos con espera exponencial y compresión gzip, para
+no abrir una conexión TLS nueva contra Render en cada petición.
+"""
+import codecs
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from evaluapp.metricas import metricas
+
+# Se puede apuntar a otro backend (p. ej. el servidor local de pruebas)
+API_BASE_URL = os.environ.get("EVALUAPP_API_URL", "https://evaluapp.onrender.com/api")
+
+# Tiempos de espera por defecto en segundos: (conexión, lectura)
+TIMEOUT_CONEXION = float(os.environ.get("EVALUAPP_TIMEOUT_CONEXION", 5))
+TIMEOUT_LECTURA = float(os.environ.get("EVALUAPP_TIMEOUT_LECTURA", 30))
+
+# Reintentos ante errores 5xx o conexiones reiniciadas
+REINTENTOS = int(os.environ.get("EVALUAPP_REINTENTOS", 3))
+FACTOR_ESPERA = 0.5
+ESTADOS_REINTENTABLES = (500, 502, 503, 504)
+
+# Conexiones que se mantienen abiertas por host
+TAMANO_POOL = 20
+
+# Peticiones simultáneas como máximo al repartir una carga en paralelo
+MAX_CONCURRENCIA = 8
+
+# Paginación al estilo Spring (?page=0&size=500). Si el servidor la ignora y
+# devuelve la lista completa, esta se procesa en streaming por lotes.
+PARAM_PAGINA = "page"
+PARAM_TAMANO = "size"
+TAMANO_PAGINA = 500
+TAMANO_FRAGMENTO = 64 * 1024
+
+
+class ClienteAPI:
+    def __init__(self, base_url=API_BASE_URL, timeout=None, reintentos=REINTENTOS,
+                 factor_espera=FACTOR_ESPERA, tamano_pool=TAMANO_POOL):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout or (TIMEOUT_CONEXION, TIMEOUT_LECTURA)
+
+        # Los POST solo se reintentan si la conexión no llegó a establecerse,
+        # para no duplicar exámenes o resultados en el servidor
+        reintento = Retry(
+            total=reintentos,
+            connect=reintentos,
+            read=reintentos,
+            status=reintentos,
+            backoff_factor=factor_espera,
+            status_forcelist=ESTADOS_REINTENTABLES,
+            allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+            raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(
+            pool_connections=tamano_pool,
+            pool_maxsize=tamano_pool,
+            max_retries=reintento,
+        )
+
+        self.sesion = requests.Session()
+        self.sesion.mount("https://", adaptador)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+    def url(self, endpoint):
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def _peticion(self, metodo, endpoint, timeout=None, **kwargs):
+        # Toda petición pasa por aquí para registrar estado, latencia y bytes
+        inicio = time.perf_counter()
+        try:
+            response = self.sesion.request(metodo, self.url(endpoint),
+                                           timeout=timeout or self.timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            metricas.registrar_peticion(metodo, endpoint, type(e).__name__, time.perf_counter() - inicio)
+            raise
+        if kwargs.get("stream"):
+            # El cuerpo aún no se ha leído: solo se conoce el tamaño anunciado
+            num_bytes = int(response.headers.get("Content-Length") or 0) or None
+        else:
+            num_bytes = len(response.content)
+        metricas.registrar_peticion(metodo, endpoint, response.status_code,
+                                    time.perf_counter() - inicio, num_bytes)
+        return response
+
+    def get(self, endpoint, params=None, timeout=None, **kwargs):
+        return self._peticion("GET", endpoint, params=params, timeout=timeout, **kwargs)
+
+    def post(self, endpoint, json=None, timeout=None, **kwargs):
+        return self._peticion("POST", endpoint, json=json, timeout=timeout, **kwargs)
+
+    def get_varios(self, peticiones, max_concurrencia=MAX_CONCURRENCIA, timeout=None):
+        # Lanza varias peticiones GET en paralelo reutilizando el pool.
+        # `peticiones` es una lista de (endpoint, params); se devuelve en el
+        # mismo orden la respuesta o la excepción de cada una.
+        peticiones = list(peticiones)
+        if not peticiones:
+            return []
+
+        def ejecutar(peticion):
+            endpoint, params = peticion
+            try:
+                return self.get(endpoint, params=params, timeout=timeout)
+            except requests.exceptions.RequestException as e:
+                return e
+
+        # Cada hilo hereda el contexto del llamante para que las métricas se
+        # anoten en la ejecución (rerun) que lanzó las peticiones
+        hilos = min(max_concurrencia, len(peticiones))
+        with ThreadPoolExecutor(max_workers=hilos) as executor:
+            futuros = [executor.submit(contextvars.copy_context().run, ejecutar, peticion)
+                       for peticion in peticiones]
+            return [futuro.result() for futuro in futuros]
+
+    def iterar_lotes(self, endpoint, params=None, tamano_pagina=TAMANO_PAGINA, timeout=None):
+        # Recorre una colección en lotes de como mucho `tamano_pagina`
+        # elementos sin cargarla entera en memoria
+        pagina = 0
+        while True:
+            params_pagina = dict(params or {}, **{PARAM_PAGINA: pagina, PARAM_TAMANO: tamano_pagina})
+            with self.get(endpoint, params=params_pagina, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                texto = _fragmentos_texto(response)
+                primero, texto = _primer_caracter(texto)
+
+                if primero == "[":
+                    # Lista completa: el servidor no pagina, se parsea en streaming
+                    lote = []
+                    for item in iterar_arreglo_json(texto):
+                        lote.append(item)
+                        if len(lote) >= tamano_pagina:
+                            yield lote
+                            lote = []
+                    if lote:
+                        yield lote
+                    return
+                if primero != "{":
+                    # Cuerpo vacío o null
+                    return
+
+                datos = json.loads("".join(texto))
+            items = datos.get("content") or []
+            if items:
+                yield items
+            if not items or datos.get("last", True):
+                return
+            pagina += 1
+
+    def contar(self, endpoint, params=None, timeout=None):
+        # Número de elementos de una colección. Con paginación basta con pedir
+        # una página de un elemento; si no, se cuentan en streaming sin guardarlos.
+        params_pagina = dict(params or {}, **{PARAM_PAGINA: 0, PARAM_TAMANO: 1})
+        with self.get(endpoint, params=params_pagina, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            texto = _fragmentos_texto(response)
+            primero, texto = _primer_caracter(texto)
+            if primero == "[":
+                return sum(1 for _ in iterar_arreglo_json(texto))
+            if primero != "{":
+                return 0
+            datos = json.loads("".join(texto))
+        if "totalElements" in datos:
+            return int(datos["totalElements"])
+        return len(datos.get("content") or [])
+
+    def cerrar(self):
+        self.sesion.close()
+
+
+def _fragmentos_texto(response):
+    # Texto de la respuesta por fragmentos, ya descomprimido y decodificado
+    decodificador = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    for fragmento in response.iter_content(chunk_size=TAMANO_FRAGMENTO):
+        texto = decodificador.decode(fragmento)
+        if texto:
+            yield texto
+    final = decodificador.decode(b"", final=True)
+    if final:
+        yield final
+
+
+def _primer_caracter(fragmentos):
+    # Devuelve el primer carácter significativo y un iterador equivalente al
+    # original (sin perder el texto ya leído)
+    fragmentos = iter(fragmentos)
+    leidos = []
+    for fragmento in fragmentos:
+        leidos.append(fragmento)
+        contenido = fragmento.lstrip()
+        if contenido:
+            return contenido[0], _encadenar(leidos, fragmentos)
+    return "", iter(leidos)
+
+
+def _encadenar(leidos, resto):
+    yield from leidos
+    yield from resto
+
+
+# Estados de iterar_arreglo_json: lo que se espera a continuación
+_ABRIR, _PRIMERO, _ELEMENTO, _SEPARADOR, _FIN = range(5)
+_ESPACIOS = " \t\r\n"
+# Caracteres con los que un número al final del buffer podría continuar
+_CONTINUA_NUMERO = set(".eE+-0123456789")
+
+
+def iterar_arreglo_json(fragmentos):
+    # Parser incremental de un arreglo JSON: entrega cada elemento en cuanto
+    # está completo, sin tener nunca el documento entero en memoria. Es
+    # estricto: exige una coma entre elementos y nada tras el "]" final.
+    decodificador = json.JSONDecoder()
+    buffer = ""
+    estado = _ABRIR
+    for fragmento in fragmentos:
+        buffer += fragmento
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _ESPACIOS:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            caracter = buffer[pos]
+            if estado == _FIN:
+                raise ValueError("JSON no válido: datos tras el final del arreglo")
+            if estado == _ABRIR:
+                if caracter != "[":
+                    raise ValueError("JSON no válido: se esperaba un arreglo")
+                estado = _PRIMERO
+                pos += 1
+                continue
+            if estado == _SEPARADOR:
+                if caracter == ",":
+                    estado = _ELEMENTO
+                elif caracter == "]":
+                    estado = _FIN
+                else:
+                    raise ValueError(f"JSON no válido: se esperaba ',' o ']' en lugar de {caracter!r}")
+                pos += 1
+                continue
+            if caracter == "]" and estado == _PRIMERO:
+                estado = _FIN
+                pos += 1
+                continue
+            if caracter in ",]":
+                raise ValueError(f"JSON no válido: se esperaba un elemento en lugar de {caracter!r}")
+            try:
+                item, fin = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Elemento incompleto: hace falta otro fragmento
+            if isinstance(item, (int, float)) and not isinstance(item, bool) \
+                    and (fin == len(buffer) or buffer[fin] in _CONTINUA_NUMERO) \
+                    and all(c in _CONTINUA_NUMERO for c in buffer[fin:]):
+                break  # Un número cortado entre fragmentos ("-1500." + "0"): esperar al resto
+            yield item
+            # Lo habitual es la coma justo detrás del elemento
+            if fin < len(buffer) and buffer[fin] == ",":
+                estado, pos = _ELEMENTO, fin + 1
+            else:
+                estado, pos = _SEPARADOR, fin
+        buffer = buffer[pos:]
+    if estado != _FIN:
+        raise ValueError("JSON incompleto: el arreglo no se cerró")
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def configurar_cliente(base_url=API_BASE_URL, **opciones):
+    # Sustituye el cliente compartido, por ejemplo para usar otra URL base
+    global _cliente
+    with _cliente_lock:
+        if _cliente is not None:
+            _cliente.cerrar()
+        _cliente = ClienteAPI(base_url, **opciones)
+    return _cliente
+
+
+def obtener_cliente():
+    # Cliente único por proceso: todas las sesiones de Streamlit y todos los
+    # scripts comparten el mismo pool de conexiones
+    global _cliente
+    if _cliente is None:
+        with _cliente_lock:
+            if _cliente is None:
+                _cliente = ClienteAPI()
+    return _cliente
@@ -0,0 +1,196 @@
+"""Fuente de datos compartida por los scripts de análisis.
+
+Cada colección se descarga como mucho una vez por ejecución y se entrega ya
+normalizada como DataFrame, para que varios análisis puedan reutilizarla.
+Con `desde_snapshot=True` las tablas se leen de los snapshots locales en vez
+de la API.
+
+Las variantes `tipadas` solo traen las columnas que usan los análisis, con
+tipos compactos (ver `evaluapp.tablas`), para trabajar con muchos más datos
+en la misma memoria.
+"""
+import os
+
+import requests
+
+from evaluapp.cliente import MAX_CONCURRENCIA, TAMANO_PAGINA, obtener_cliente
+from evaluapp.snapshots import PARAM_DESDE_ID, AlmacenSnapshots, ErrorSnapshot
+from evaluapp.tablas import COLUMNAS, concatenar, tabla_resultados, tabla_tipada, tipar
+
+# Colección de snapshot correspondiente a cada endpoint
+COLECCIONES = {
+    "examenes": "examenes",
+    "preguntas": "preguntas",
+    "resultados": "resultados",
+    "admin/users": "usuarios",
+}
+
+
+class ErrorDatos(Exception):
+    pass
+
+
+# pandas se importa al construir la primera tabla, una vez descargados los
+# datos, y no al importar el módulo
+
+def _tabla_json(registros):
+    import pandas as pd
+    return pd.json_normalize(registros, sep=".")
+
+
+def _tabla_registros(registros):
+    import pandas as pd
+    return pd.DataFrame(registros)
+
+
+def _concatenar(tablas):
+    import pandas as pd
+    return pd.concat(tablas or [pd.DataFrame()], ignore_index=True)
+
+
+class FuenteDatos:
+    def __init__(self, cliente=None, concurrencia=MAX_CONCURRENCIA, timeout=None,
+                 desde_snapshot=False, almacen=None):
+        self.cliente = cliente or obtener_cliente()
+        self.desde_snapshot = desde_snapshot
+        self.almacen = almacen or AlmacenSnapshots()
+        self.concurrencia = concurrencia
+        self.timeout = timeout
+        self._crudos = {}
+        self._tablas = {}
+        self.fallos_opciones = []
+
+    @property
+    def origen(self):
+        # Identifica de dónde salen los datos, para no mezclar agregados de
+        # fuentes distintas
+        if self.desde_snapshot:
+            return f"snapshot:{os.path.abspath(self.almacen.directorio)}"
+        return self.cliente.base_url
+
+    def crudo(self, endpoint):
+        # JSON tal como lo devuelve la API, descargado una sola vez
+        if self.desde_snapshot:
+            return self._tabla(COLECCIONES[endpoint], None).to_dict("records")
+        if endpoint not in self._crudos:
+            response = self.cliente.get(endpoint, timeout=self.timeout)
+            if response.status_code != 200:
+                raise ErrorDatos(f"Error {response.status_code} al obtener {endpoint}: {response.text[:200]}")
+            self._crudos[endpoint] = response.json() or []
+        return self._crudos[endpoint]
+
+    def _tabla(self, nombre, construir):
+        if nombre not in self._tablas:
+            if self.desde_snapshot:
+                try:
+                    self._tablas[nombre] = self.almacen.cargar(nombre)
+                except ErrorSnapshot as e:
+                    raise ErrorDatos(str(e))
+            else:
+                self._tablas[nombre] = construir()
+        return self._tablas[nombre]
+
+    def guardar_snapshots(self, nombres):
+        # Persiste las colecciones indicadas, descargándolas si hace falta
+        metadatos = {}
+        for nombre in nombres:
+            metadatos[nombre] = self.almacen.guardar(nombre, getattr(self, nombre)())
+        return metadatos
+
+    def examenes(self):
+        return self._tabla("examenes", lambda: _tabla_json(self.crudo("examenes")))
+
+    def preguntas(self):
+        return self._tabla("preguntas", lambda: _tabla_json(self.crudo("preguntas")))
+
+    def resultados(self):
+        return self._tabla("resultados", lambda: _concatenar(list(self._lotes_api("resultados"))))
+
+    def resultados_por_lotes(self, tamano_lote=TAMANO_PAGINA, desde_id=None, tipados=False):
+        # DataFrames parciales de resultados para agregaciones con memoria
+        # acotada. Si la tabla ya está cargada se recorre en trozos en vez de
+        # volver a descargarla. Con `desde_id` se piden solo los resultados
+        # posteriores; si el servidor ignora el filtro llegan todos y quien
+        # consume los lotes debe descartar los ya vistos. Con `tipados` cada
+        # lote trae solo las columnas de COLUMNAS["resultados"].
+        columnas = COLUMNAS["resultados"] if tipados else None
+        if self.desde_snapshot or "resultados" in self._tablas:
+            # Sin la tabla completa en memoria, del snapshot solo se leen las columnas necesarias
+            ya_tipada = tipados and "resultados" not in self._tablas
+            tabla = self._tabla_snapshot_tipada("resultados") if ya_tipada else self.resultados()
+            if desde_id is not None and "id" in tabla.columns:
+                # Con ids nulos (Int64) la comparación da <NA>: esas filas se descartan
+                tabla = tabla[(tabla["id"] > desde_id).fillna(False).astype(bool)]
+            for inicio in range(0, len(tabla), tamano_lote):
+                lote = tabla.iloc[inicio:inicio + tamano_lote]
+                yield tipar(lote, columnas) if tipados and not ya_tipada else lote
+        else:
+            params = {PARAM_DESDE_ID: desde_id} if desde_id is not None else None
+            yield from self._lotes_api("resultados", tamano_lote, params, columnas)
+
+    def _lotes_api(self, endpoint, tamano_lote=TAMANO_PAGINA, params=None, columnas=None):
+        try:
+            for lote in self.cliente.iterar_lotes(endpoint, params=params, tamano_pagina=tamano_lote,
+                                                  timeout=self.timeout):
+                if columnas is not None:
+                    yield tabla_tipada(lote, columnas)
+                else:
+                    yield tabla_resultados(lote) if endpoint == "resultados" else _tabla_json(lote)
+        except requests.exceptions.HTTPError as e:
+            raise ErrorDatos(f"Error al obtener {endpoint}: {e}")
+        except ValueError as e:
+            raise ErrorDatos(f"Respuesta no válida de {endpoint}: {e}")
+
+    def usuarios(self):
+        return self._tabla("usuarios", lambda: _tabla_registros(self.crudo("admin/users")))
+
+    def usuarios_tipados(self):
+        # Solo id y rol, con el rol como categórica. Se descargan por lotes
+        # sin guardar el JSON completo; si la tabla completa ya está cargada
+        # se reutiliza.
+        if "usuarios" in self._tablas:
+            return tipar(self._tablas["usuarios"], COLUMNAS["usuarios"])
+        if self.desde_snapshot:
+            return self._tabla_snapshot_tipada("usuarios")
+        return self._tabla("usuarios_tipados", lambda: concatenar(
+            list(self._lotes_api("admin/users", columnas=COLUMNAS["usuarios"]))))
+
+    def _tabla_snapshot_tipada(self, nombre):
+        # Lee del snapshot solo las columnas necesarias
+        def cargar():
+            try:
+                return tipar(self.almacen.cargar(nombre, columnas=list(COLUMNAS[nombre])), COLUMNAS[nombre])
+            except ErrorSnapshot as e:
+                raise ErrorDatos(str(e))
+        if f"{nombre}_tipados" not in self._tablas:
+            self._tablas[f"{nombre}_tipados"] = cargar()
+        return self._tablas[f"{nombre}_tipados"]
+
+    def opciones(self):
+        return self._tabla("opciones", self._cargar_opciones)
+
+    def _cargar_opciones(self):
+        # Las opciones solo se pueden pedir por pregunta: se reparten en
+        # paralelo y las preguntas que fallan se anotan en fallos_opciones
+        preguntas = self.crudo("preguntas")
+        respuestas = self.cliente.get_varios(
+            [(f"opciones/pregunta/{pregunta['id']}", None) for pregunta in preguntas],
+            max_concurrencia=max(1, self.concurrencia),
+            timeout=self.timeout,
+        )
+
+        todas_opciones = []
+        self.fallos_opciones = []
+        for pregunta, response in zip(preguntas, respuestas):
+            pregunta_id = pregunta["id"]
+            if isinstance(response, Exception):
+                self.fallos_opciones.append((pregunta_id, str(response)))
+                continue
+            if response.status_code != 200:
+                self.fallos_opciones.append((pregunta_id, f"HTTP {response.status_code}"))
+                continue
+            for opcion in response.json() or []:
+                opcion["pregunta_id"] = pregunta_id
+                opcion["texto_pregunta"] = pregunta.get("textoPregunta", "sin texto")
+                todas_opciones.append(opcion)
+        return _tabla_json(todas_opciones)
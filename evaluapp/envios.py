@@ -0,0 +1,236 @@
+"""Cola local y persistente de envíos a la API.
+
+Los resultados de un examen se guardan primero en SQLite y después se envían
+en segundo plano, de modo que un fallo o un tiempo de espera agotado no hace
+perder las respuestas. Cada envío lleva una clave de idempotencia
+(`Idempotency-Key`) que se mantiene en todos sus reintentos, para que el
+servidor pueda descartar duplicados.
+
+La cola se vacía con un número acotado de POST simultáneos compartido por
+todo el proceso: cuando muchos estudiantes terminan a la vez, los envíos se
+escalonan en lugar de lanzarse todos contra el backend al mismo tiempo.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import requests
+
+from evaluapp.cache import cache_api
+from evaluapp.cliente import REINTENTOS, TIMEOUT_CONEXION, TIMEOUT_LECTURA, obtener_cliente
+
+logger = logging.getLogger("evaluapp.envios")
+
+RUTA = os.environ.get(
+    "EVALUAPP_COLA",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cola", "envios.sqlite3"),
+)
+
+PENDIENTE = "pendiente"
+ENVIANDO = "enviando"
+CONFIRMADO = "confirmado"
+FALLIDO = "fallido"
+
+# POST simultáneos como máximo y envíos que se toman en cada vaciado
+MAX_CONCURRENCIA = 4
+TAMANO_LOTE = 50
+
+# Reintentos con espera exponencial: 2 s, 4 s, 8 s... hasta 5 minutos
+MAX_INTENTOS = 10
+ESPERA_BASE = 2.0
+ESPERA_MAXIMA = 300.0
+# Estados HTTP que se reintentan; el resto de 4xx son fallos definitivos
+ESTADOS_REINTENTABLES = {408, 425, 429, 500, 502, 503, 504}
+
+INTERVALO_VACIADO = 2.0
+
+# Un envío que sigue "enviando" pasado este tiempo sin cambios es de un
+# proceso que murió a medias: ningún POST, con sus reintentos, tarda tanto
+ENVIO_ABANDONADO = (REINTENTOS + 1) * (TIMEOUT_CONEXION + TIMEOUT_LECTURA) + 60
+
+CABECERA_IDEMPOTENCIA = "Idempotency-Key"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS envios (
+    clave TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    cuerpo TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    intentos INTEGER NOT NULL DEFAULT 0,
+    creado_en REAL NOT NULL,
+    actualizado_en REAL NOT NULL,
+    proximo_intento REAL NOT NULL,
+    ultimo_error TEXT,
+    respuesta TEXT
+);
+CREATE INDEX IF NOT EXISTS envios_pendientes ON envios (estado, proximo_intento);
+"""
+
+
+class ColaEnvios:
+    def __init__(self, ruta=RUTA, cliente=None, max_concurrencia=MAX_CONCURRENCIA,
+                 max_intentos=MAX_INTENTOS):
+        self.ruta = ruta
+        self.cliente = cliente
+        self.max_concurrencia = max_concurrencia
+        self.max_intentos = max_intentos
+        self._hilo = None
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with self._conexion() as conexion:
+            conexion.executescript(_ESQUEMA)
+
+    def _conexion(self):
+        # Una conexión por operación: SQLite no comparte conexiones entre hilos
+        conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.row_factory = sqlite3.Row
+        return closing(conexion)
+
+    def encolar(self, endpoint, cuerpo):
+        # Guarda el envío antes de intentar nada y devuelve su clave
+        clave = str(uuid.uuid4())
+        ahora = time.time()
+        with self._conexion() as conexion:
+            conexion.execute(
+                "INSERT INTO envios (clave, endpoint, cuerpo, estado, creado_en, actualizado_en, proximo_intento)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (clave, endpoint, json.dumps(cuerpo, ensure_ascii=False), PENDIENTE, ahora, ahora, ahora),
+            )
+        self._despertar.set()
+        return clave
+
+    def estado(self, clave):
+        with self._conexion() as conexion:
+            fila = conexion.execute("SELECT * FROM envios WHERE clave = ?", (clave,)).fetchone()
+        return _envio(fila) if fila else None
+
+    def estados(self, claves):
+        return {clave: self.estado(clave) for clave in claves}
+
+    def resumen(self):
+        with self._conexion() as conexion:
+            filas = conexion.execute("SELECT estado, COUNT(*) FROM envios GROUP BY estado").fetchall()
+        return {estado: n for estado, n in filas}
+
+    def _tomar(self, limite):
+        # Marca como "enviando" los envíos que ya toca intentar. La
+        # transacción inmediata impide que otro proceso tome los mismos. Los
+        # que otro proceso dejó "enviando" solo se retoman cuando llevan más
+        # de ENVIO_ABANDONADO sin cambios: si ese proceso sigue vivo (otro
+        # worker de Streamlit, un script) todavía los está enviando.
+        ahora = time.time()
+        with self._conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            filas = conexion.execute(
+                "SELECT * FROM envios WHERE (estado = ? AND proximo_intento <= ?)"
+                " OR (estado = ? AND actualizado_en < ?) ORDER BY creado_en LIMIT ?",
+                (PENDIENTE, ahora, ENVIANDO, ahora - ENVIO_ABANDONADO, limite)).fetchall()
+            conexion.executemany("UPDATE envios SET estado = ?, actualizado_en = ? WHERE clave = ?",
+                                 [(ENVIANDO, ahora, f["clave"]) for f in filas])
+            conexion.execute("COMMIT")
+        return [_envio(f) for f in filas]
+
+    def _enviar(self, envio):
+        cliente = self.cliente or obtener_cliente()
+        try:
+            response = cliente.post(envio["endpoint"], json=envio["cuerpo"],
+                                    headers={CABECERA_IDEMPOTENCIA: envio["clave"]})
+        except requests.exceptions.RequestException as e:
+            return self._reintentar(envio, f"{type(e).__name__}: {e}")
+
+        if response.status_code in (200, 201):
+            self._actualizar(envio["clave"], CONFIRMADO, respuesta=response.text)
+            cache_api.invalidar(envio["endpoint"].split("?")[0].split("/")[0])
+            return CONFIRMADO
+        error = f"HTTP {response.status_code}: {response.text[:200]}"
+        if response.status_code in ESTADOS_REINTENTABLES:
+            return self._reintentar(envio, error)
+        self._actualizar(envio["clave"], FALLIDO, error=error)
+        return FALLIDO
+
+    def _reintentar(self, envio, error):
+        intentos = envio["intentos"] + 1
+        if intentos >= self.max_intentos:
+            self._actualizar(envio["clave"], FALLIDO, error=error, intentos=intentos)
+            return FALLIDO
+        espera = min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** (intentos - 1))
+        self._actualizar(envio["clave"], PENDIENTE, error=error, intentos=intentos,
+                         proximo_intento=time.time() + espera)
+        return PENDIENTE
+
+    def _actualizar(self, clave, estado, error=None, respuesta=None, intentos=None, proximo_intento=None):
+        with self._conexion() as conexion:
+            conexion.execute(
+                "UPDATE envios SET estado = ?, actualizado_en = ?, ultimo_error = COALESCE(?, ultimo_error),"
+                " respuesta = COALESCE(?, respuesta), intentos = COALESCE(?, intentos),"
+                " proximo_intento = COALESCE(?, proximo_intento) WHERE clave = ?",
+                (estado, time.time(), error, respuesta, intentos, proximo_intento, clave),
+            )
+
+    def vaciar(self, limite=TAMANO_LOTE):
+        # Envía un lote de pendientes con como mucho `max_concurrencia` POST a
+        # la vez. Devuelve cuántos terminaron en cada estado.
+        envios = self._tomar(limite)
+        if not envios:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrencia, len(envios))) as executor:
+            estados = list(executor.map(self._enviar, envios))
+        return {estado: estados.count(estado) for estado in set(estados)}
+
+    def iniciar(self, intervalo=INTERVALO_VACIADO):
+        # Hilo de fondo que vacía la cola periódicamente y en cuanto se encola algo
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, args=(intervalo,), daemon=True,
+                                      name="evaluapp-envios")
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def _bucle(self, intervalo):
+        while not self._detener.is_set():
+            self._despertar.clear()
+            try:
+                # Mientras haya lotes llenos se sigue vaciando sin esperar
+                while sum(self.vaciar().values()) >= TAMANO_LOTE:
+                    pass
+            except Exception:
+                # El hilo no debe morir: lo pendiente se reintenta en la siguiente vuelta
+                logger.exception("Error al vaciar la cola de envíos %s", self.ruta)
+            self._despertar.wait(intervalo)
+
+
+def _envio(fila):
+    envio = dict(fila)
+    envio["cuerpo"] = json.loads(envio["cuerpo"])
+    return envio
+
+
+_cola = None
+_cola_lock = threading.Lock()
+
+
+def obtener_cola():
+    # Cola única por proceso, con su hilo de vaciado ya en marcha
+    global _cola
+    if _cola is None:
+        with _cola_lock:
+            if _cola is None:
+                _cola = ColaEnvios()
+                _cola.iniciar()
+    return _cola
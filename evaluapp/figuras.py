@@ -0,0 +1,83 @@
+"""Gestión de las figuras de los reportes.
+
+En modo interactivo cada gráfico abre su propia ventana al final del reporte.
+En modo headless (con directorio de salida) se usa el backend Agg, que no
+necesita pantalla, se reutiliza una única figura para todos los gráficos y se
+escribe cada uno a disco en los formatos pedidos.
+"""
+import os
+
+FORMATOS = ("png", "svg", "pdf")
+TAMANO_DEFECTO = (6.4, 4.8)
+
+
+class Figuras:
+    def __init__(self, directorio=None, formatos=("png",), dpi=100):
+        self.directorio = directorio
+        self.formatos = tuple(formatos)
+        self.dpi = dpi
+        self.archivos = []
+        self._figura = None
+        self._plt = None
+        if self.headless:
+            os.makedirs(directorio, exist_ok=True)
+
+    @property
+    def plt(self):
+        # matplotlib tarda en importarse: se carga al pedir la primera figura,
+        # no al arrancar el script
+        if self._plt is None:
+            import matplotlib.pyplot as plt
+            if self.headless:
+                plt.switch_backend("Agg")
+            self._plt = plt
+        return self._plt
+
+    @property
+    def headless(self):
+        return self.directorio is not None
+
+    def nueva(self, figsize=TAMANO_DEFECTO):
+        # Devuelve (fig, ax) listos para dibujar
+        if self.headless:
+            if self._figura is None:
+                self._figura = self.plt.figure()
+            fig = self._figura
+            fig.clf()
+            fig.set_size_inches(figsize)
+        else:
+            fig = self.plt.figure(figsize=figsize)
+        # Equivale a tight_layout(), aplicado cada vez que se dibuja
+        fig.set_layout_engine("tight")
+        return fig, fig.add_subplot()
+
+    def guardar(self, fig, nombre):
+        if not self.headless:
+            return
+        for formato in self.formatos:
+            ruta = os.path.join(self.directorio, f"{nombre}.{formato}")
+            fig.savefig(ruta, format=formato, dpi=self.dpi)
+            self.archivos.append(ruta)
+
+    def finalizar(self):
+        # Muestra las ventanas o libera la figura reutilizada
+        if self._plt is None:
+            return  # No se dibujó nada
+        if self.headless:
+            if self._figura is not None:
+                self.plt.close(self._figura)
+                self._figura = None
+            self.plt.close("all")
+        else:
+            self.plt.show()
+
+
+def agregar_argumentos_figuras(parser):
+    parser.add_argument("--salida", default=None,
+                        help="directorio donde guardar los gráficos sin abrir ventanas")
+    parser.add_argument("--formato", nargs="+", choices=FORMATOS, default=["png"],
+                        help="formatos de imagen en modo --salida")
+
+
+def figuras_desde_argumentos(args):
+    return Figuras(args.salida, args.formato)
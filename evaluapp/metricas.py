@@ -0,0 +1,248 @@
+"""Métricas de peticiones, caché y secciones de página.
+
+Cada petición a la API registra endpoint, método, estado HTTP, latencia y
+bytes; `get_data` añade si se sirvió desde la caché, y la app mide el tiempo
+de cada sección de página. Los datos se acumulan por proceso (para exportar en
+formato de texto de Prometheus) y, además, por ejecución del script: la app
+abre una ejecución en cada rerun y el panel de depuración muestra solo lo que
+ocurrió en ella.
+
+Con `EVALUAPP_LOG_METRICAS=1` cada evento se escribe también como una línea
+JSON en el logger `evaluapp.metricas`.
+"""
+import contextvars
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("evaluapp.metricas")
+
+LOG_METRICAS = os.environ.get("EVALUAPP_LOG_METRICAS") == "1"
+
+# Límites (en segundos) del histograma de latencias de Prometheus
+INTERVALOS_LATENCIA = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Latencias recientes que se guardan por endpoint para calcular percentiles
+MAX_MUESTRAS = 1000
+PERCENTILES = (50, 90, 99)
+
+# Los ids numéricos de la ruta se sustituyen para no crear una serie por id
+_SEGMENTO_ID = re.compile(r"/\d+(?=/|$)")
+
+
+def plantilla_endpoint(endpoint):
+    ruta = "/" + endpoint.split("?")[0].strip("/")
+    return _SEGMENTO_ID.sub("/{id}", ruta).lstrip("/")
+
+
+def percentil(valores, p):
+    # Percentil por rango más cercano sobre una lista ya ordenada
+    if not valores:
+        return None
+    indice = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[indice]
+
+
+class Ejecucion:
+    # Eventos de un único rerun de la app (o de una ejecución de un script)
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.peticiones = []  # dicts con endpoint, metodo, estado, segundos, bytes
+        self.cache = []       # dicts con endpoint y acierto
+        self.secciones = []   # (nombre, segundos)
+        self._lock = threading.Lock()
+
+    def agregar(self, lista, evento):
+        with self._lock:
+            getattr(self, lista).append(evento)
+
+    @property
+    def duracion(self):
+        return time.perf_counter() - self.inicio
+
+
+_ejecucion = contextvars.ContextVar("evaluapp_ejecucion", default=None)
+
+
+class Metricas:
+    def __init__(self, intervalos=INTERVALOS_LATENCIA, max_muestras=MAX_MUESTRAS):
+        self.intervalos = tuple(intervalos)
+        self.max_muestras = max_muestras
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.peticiones = defaultdict(int)  # (endpoint, metodo, estado) -> n
+            self.bytes = defaultdict(int)       # endpoint -> bytes recibidos
+            self.histogramas = {}               # (endpoint, metodo) -> [cubetas..., suma, n]
+            self.muestras = defaultdict(lambda: deque(maxlen=self.max_muestras))
+            self.cache = defaultdict(int)       # (endpoint, "acierto"|"fallo") -> n
+            self.secciones = defaultdict(lambda: [0.0, 0])  # nombre -> [segundos, n]
+            self.ejecuciones = 0
+
+    # Ejecuciones
+
+    def iniciar_ejecucion(self):
+        ejecucion = Ejecucion()
+        _ejecucion.set(ejecucion)
+        with self._lock:
+            self.ejecuciones += 1
+        return ejecucion
+
+    @staticmethod
+    def ejecucion_actual():
+        return _ejecucion.get()
+
+    def _emitir(self, lista, evento):
+        ejecucion = _ejecucion.get()
+        if ejecucion is not None:
+            ejecucion.agregar(lista, evento)
+        if LOG_METRICAS:
+            logger.info(json.dumps(dict(evento, tipo=lista), ensure_ascii=False))
+
+    # Registro
+
+    def registrar_peticion(self, metodo, endpoint, estado, segundos, num_bytes=None):
+        # estado: código HTTP, o el nombre de la excepción si no hubo respuesta
+        endpoint = plantilla_endpoint(endpoint)
+        with self._lock:
+            self.peticiones[(endpoint, metodo, str(estado))] += 1
+            if num_bytes:
+                self.bytes[endpoint] += num_bytes
+            histograma = self.histogramas.setdefault(
+                (endpoint, metodo), [0] * len(self.intervalos) + [0.0, 0])
+            for i, limite in enumerate(self.intervalos):
+                if segundos <= limite:
+                    histograma[i] += 1
+            histograma[-2] += segundos
+            histograma[-1] += 1
+            self.muestras[endpoint].append(segundos)
+        self._emitir("peticiones", {
+            "endpoint": endpoint, "metodo": metodo, "estado": estado,
+            "segundos": round(segundos, 6), "bytes": num_bytes,
+        })
+
+    def registrar_cache(self, endpoint, acierto):
+        endpoint = plantilla_endpoint(endpoint)
+        with self._lock:
+            self.cache[(endpoint, "acierto" if acierto else "fallo")] += 1
+        self._emitir("cache", {"endpoint": endpoint, "acierto": acierto})
+
+    def registrar_seccion(self, nombre, segundos):
+        with self._lock:
+            acumulado = self.secciones[nombre]
+            acumulado[0] += segundos
+            acumulado[1] += 1
+        self._emitir("secciones", {"seccion": nombre, "segundos": round(segundos, 6)})
+
+    @contextmanager
+    def seccion(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_seccion(nombre, time.perf_counter() - inicio)
+
+    # Consulta y exportación
+
+    def latencias(self):
+        # Percentiles en milisegundos de las últimas peticiones de cada endpoint
+        with self._lock:
+            muestras = {endpoint: sorted(valores) for endpoint, valores in self.muestras.items()}
+        return {
+            endpoint: dict({f"p{p}": percentil(valores, p) * 1000 for p in PERCENTILES}, n=len(valores))
+            for endpoint, valores in sorted(muestras.items())
+        }
+
+    def exportar_prometheus(self):
+        with self._lock:
+            lineas = [
+                "# HELP evaluapp_peticiones_total Peticiones a la API por endpoint, método y estado.",
+                "# TYPE evaluapp_peticiones_total counter",
+            ]
+            for (endpoint, metodo, estado), n in sorted(self.peticiones.items()):
+                lineas.append(f'evaluapp_peticiones_total{{endpoint="{endpoint}",metodo="{metodo}",'
+                              f'estado="{estado}"}} {n}')
+
+            lineas += [
+                "# HELP evaluapp_peticion_segundos Latencia de las peticiones a la API.",
+                "# TYPE evaluapp_peticion_segundos histogram",
+            ]
+            for (endpoint, metodo), histograma in sorted(self.histogramas.items()):
+                etiquetas = f'endpoint="{endpoint}",metodo="{metodo}"'
+                for limite, n in zip(self.intervalos, histograma):
+                    lineas.append(f'evaluapp_peticion_segundos_bucket{{{etiquetas},le="{limite}"}} {n}')
+                lineas.append(f'evaluapp_peticion_segundos_bucket{{{etiquetas},le="+Inf"}} {histograma[-1]}')
+                lineas.append(f"evaluapp_peticion_segundos_sum{{{etiquetas}}} {histograma[-2]:.6f}")
+                lineas.append(f"evaluapp_peticion_segundos_count{{{etiquetas}}} {histograma[-1]}")
+
+            lineas += [
+                "# HELP evaluapp_respuesta_bytes_total Bytes recibidos de la API por endpoint.",
+                "# TYPE evaluapp_respuesta_bytes_total counter",
+            ]
+            for endpoint, n in sorted(self.bytes.items()):
+                lineas.append(f'evaluapp_respuesta_bytes_total{{endpoint="{endpoint}"}} {n}')
+
+            lineas += [
+                "# HELP evaluapp_cache_total Consultas a la caché por endpoint y resultado.",
+                "# TYPE evaluapp_cache_total counter",
+            ]
+            for (endpoint, resultado), n in sorted(self.cache.items()):
+                lineas.append(f'evaluapp_cache_total{{endpoint="{endpoint}",resultado="{resultado}"}} {n}')
+
+            lineas += [
+                "# HELP evaluapp_seccion_segundos Tiempo acumulado por sección de página.",
+                "# TYPE evaluapp_seccion_segundos summary",
+            ]
+            for nombre, (segundos, n) in sorted(self.secciones.items()):
+                lineas.append(f'evaluapp_seccion_segundos_sum{{seccion="{nombre}"}} {segundos:.6f}')
+                lineas.append(f'evaluapp_seccion_segundos_count{{seccion="{nombre}"}} {n}')
+
+            lineas += [
+                "# HELP evaluapp_ejecuciones_total Ejecuciones (reruns) del script de la app.",
+                "# TYPE evaluapp_ejecuciones_total counter",
+                f"evaluapp_ejecuciones_total {self.ejecuciones}",
+            ]
+        return "\n".join(lineas) + "\n"
+
+
+metricas = Metricas()
+
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        datos = metricas.exportar_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+
+_servidor = None
+_servidor_lock = threading.Lock()
+
+
+def servir_metricas(puerto, host="0.0.0.0"):
+    # Expone /metrics para Prometheus en un hilo aparte; una sola vez por proceso
+    global _servidor
+    with _servidor_lock:
+        if _servidor is None:
+            _servidor = ThreadingHTTPServer((host, puerto), _ManejadorMetricas)
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+    return _servidor
@@ -0,0 +1,149 @@
+"""Normalización de las respuestas JSON de la API.
+
+Cada tipo de entidad (examen, pregunta, opción, resultado, usuario) tiene un
+esquema con la conversión de cada campo. Los registros se validan y convierten
+en una sola pasada, sin copiarlos, y los que no cumplen el esquema se
+descartan y se informan en lugar de quedarse con ids a 0.
+"""
+import logging
+
+from evaluapp.metricas import plantilla_endpoint
+
+logger = logging.getLogger("evaluapp.normalizacion")
+
+
+def _entero(valor):
+    if type(valor) is int:
+        return valor
+    if type(valor) is str:
+        try:
+            return int(valor)
+        except ValueError:
+            pass
+    elif type(valor) is float and valor.is_integer():
+        return int(valor)
+    raise ValueError(f"no es un entero: {valor!r}")
+
+
+def _lista_enteros(valor):
+    if valor is None:
+        return []
+    if type(valor) is not list:
+        raise ValueError(f"no es una lista: {valor!r}")
+    # Lo habitual es que ya lleguen como enteros: entonces no se copia la lista
+    for elemento in valor:
+        if type(elemento) is not int:
+            # Cada elemento con las mismas reglas que un id suelto: "3" y 3.0
+            # valen, 1.9 o True no
+            return [_entero(e) for e in valor]
+    return valor
+
+
+def _booleano(valor):
+    if type(valor) is bool:
+        return valor
+    if valor in (0, 1):
+        return bool(valor)
+    if isinstance(valor, str) and valor.strip().lower() in ("true", "false", "1", "0"):
+        return valor.strip().lower() in ("true", "1")
+    raise ValueError(f"no es un booleano: {valor!r}")
+
+
+def _numero(valor):
+    if type(valor) in (int, float):
+        return valor
+    try:
+        if isinstance(valor, str):
+            return float(valor)
+    except ValueError:
+        pass
+    raise ValueError(f"no es un número: {valor!r}")
+
+
+# campo -> (conversión, obligatorio, valor por defecto si falta o es nulo).
+# Un campo opcional sin valor por defecto que falta o es nulo se deja tal cual.
+ESQUEMAS = {
+    "examen": {
+        "id": (_entero, True, None),
+        "preguntasIds": (_lista_enteros, False, list),
+        "creadorId": (_entero, False, None),
+    },
+    "pregunta": {
+        "id": (_entero, True, None),
+    },
+    "opcion": {
+        "id": (_entero, True, None),
+        "esCorrecta": (_booleano, False, None),
+        "preguntaId": (_entero, False, None),
+    },
+    "resultado": {
+        "id": (_entero, True, None),
+        "puntaje": (_numero, False, None),
+    },
+    "usuario": {
+        "id": (_entero, True, None),
+    },
+}
+
+ENTIDAD_POR_ENDPOINT = {
+    "examenes": "examen",
+    "preguntas": "pregunta",
+    "opciones": "opcion",
+    "opciones/pregunta/{id}": "opcion",
+    "resultados": "resultado",
+    "teacher/profile": "usuario",
+    "admin/users": "usuario",
+}
+
+# Endpoints sin esquema propio: solo se exige un id entero
+ESQUEMA_GENERICO = {"id": (_entero, False, None)}
+
+
+def normalizar(registros, esquema):
+    # Convierte en el sitio los campos de cada registro. Devuelve los
+    # registros válidos y, de los demás, su posición, id y motivo.
+    validos = []
+    invalidos = []
+    campos = list(esquema.items())
+    for indice, registro in enumerate(registros):
+        if not isinstance(registro, dict):
+            invalidos.append({"indice": indice, "id": None, "motivo": "no es un objeto"})
+            continue
+        try:
+            for campo, (convertir, obligatorio, por_defecto) in campos:
+                valor = registro.get(campo)
+                if valor is None:
+                    if obligatorio:
+                        raise ValueError(f"falta {campo}")
+                    if por_defecto is not None:
+                        registro[campo] = por_defecto()
+                    continue
+                try:
+                    registro[campo] = convertir(valor)
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"{campo} {e}") from None
+        except ValueError as e:
+            invalidos.append({"indice": indice, "id": registro.get("id"), "motivo": str(e)})
+            continue
+        validos.append(registro)
+    return validos, invalidos
+
+
+def normalizar_respuesta(endpoint, data):
+    # Normaliza la respuesta de un endpoint según su tipo de entidad. Las
+    # respuestas que no son listas (null, un objeto) se devuelven sin tocar.
+    if data is None:
+        return [], []
+    if not isinstance(data, list):
+        return data, []
+    entidad = ENTIDAD_POR_ENDPOINT.get(plantilla_endpoint(endpoint))
+    validos, invalidos = normalizar(data, ESQUEMAS.get(entidad, ESQUEMA_GENERICO))
+    if invalidos:
+        logger.warning("%s: %d registros no válidos descartados (%s)", endpoint, len(invalidos),
+                       "; ".join(describir(i) for i in invalidos[:5]))
+    return validos, invalidos
+
+
+def describir(invalido):
+    quien = f"id {invalido['id']!r}" if invalido["id"] is not None else f"posición {invalido['indice']}"
+    return f"{quien}: {invalido['motivo']}"
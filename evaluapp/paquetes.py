@@ -0,0 +1,218 @@
+"""Paquetes de examen: examen, preguntas en orden y opciones en un solo artefacto.
+
+Un examen publicado no cambia, así que todo lo necesario para presentarlo se
+descarga una vez (con `examenes/{id}/preguntas`, que ya trae las opciones
+embebidas) y se guarda como JSON comprimido con gzip. El paquete se guarda en
+disco y en memoria, y lo comparten todas las sesiones del proceso.
+
+La clave es el id del examen más una huella de su registro (título,
+descripción y `preguntasIds`): si se reasignan las preguntas de un examen la
+huella cambia y el paquete se reconstruye. Cada paquete lleva además el hash
+de su contenido, que sirve de versión.
+
+Los paquetes no incluyen `esCorrecta`: solo lo necesario para responder.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from evaluapp.cliente import obtener_cliente
+from evaluapp.normalizacion import ESQUEMAS, normalizar, normalizar_respuesta
+
+DIRECTORIO = os.environ.get(
+    "EVALUAPP_PAQUETES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "paquetes"),
+)
+
+# 2: el texto de la pregunta también se toma de "pregunta" (los paquetes de
+# la versión 1 construidos contra la API real lo tienen vacío)
+VERSION = 2
+MAX_MEMORIA = 64
+
+# Campos que se copian a cada paquete
+CAMPOS_EXAMEN = ("id", "titulo", "descripcion", "preguntasIds")
+CAMPOS_PREGUNTA = ("id", "textoPregunta", "tipoPregunta")
+CAMPOS_OPCION = ("id", "textoOpcion")
+
+
+class ErrorPaquete(Exception):
+    pass
+
+
+def _json(datos):
+    # JSON canónico: mismo contenido, mismos bytes
+    return json.dumps(datos, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def huella_examen(examen):
+    registro = {campo: examen.get(campo) for campo in CAMPOS_EXAMEN}
+    return hashlib.sha256(_json(registro).encode("utf-8")).hexdigest()[:16]
+
+
+def _texto_pregunta(pregunta):
+    # `preguntas` lo trae en "textoPregunta"; `examenes/{id}/preguntas`, en "pregunta"
+    return pregunta.get("textoPregunta") or pregunta.get("pregunta")
+
+
+class PaqueteExamen:
+    def __init__(self, examen, preguntas, huella, hash_contenido, version=VERSION):
+        self.examen = examen
+        self.preguntas = preguntas  # en el orden del examen, cada una con "opciones"
+        self.huella = huella
+        self.hash = hash_contenido
+        self.version = version
+        self.preguntas_por_id = {p["id"]: p for p in preguntas}
+        self.opciones_por_id = {p["id"]: {o["id"]: o for o in p["opciones"]} for p in preguntas}
+
+    @classmethod
+    def construir(cls, examen, preguntas):
+        # `preguntas`: registros con sus opciones embebidas, en cualquier orden
+        examen = {campo: examen.get(campo) for campo in CAMPOS_EXAMEN}
+        por_id = {p["id"]: p for p in preguntas}
+        orden = examen["preguntasIds"] or [p["id"] for p in preguntas]
+        compactas = [
+            dict({campo: por_id[p].get(campo) for campo in CAMPOS_PREGUNTA},
+                 textoPregunta=_texto_pregunta(por_id[p]),
+                 opciones=[{campo: o.get(campo) for campo in CAMPOS_OPCION} for o in por_id[p]["opciones"]])
+            for p in orden if p in por_id
+        ]
+        contenido = _json({"examen": examen, "preguntas": compactas})
+        return cls(examen, compactas, huella_examen(examen),
+                   hashlib.sha256(contenido.encode("utf-8")).hexdigest())
+
+    def pregunta(self, pregunta_id):
+        return self.preguntas_por_id.get(pregunta_id)
+
+    def opcion(self, pregunta_id, opcion_id):
+        return self.opciones_por_id.get(pregunta_id, {}).get(opcion_id)
+
+    def serializar(self):
+        return gzip.compress(_json({
+            "version": self.version, "huella": self.huella, "hash": self.hash,
+            "examen": self.examen, "preguntas": self.preguntas,
+        }).encode("utf-8"))
+
+    @classmethod
+    def deserializar(cls, datos):
+        contenido = json.loads(gzip.decompress(datos))
+        if contenido.get("version") != VERSION:
+            raise ErrorPaquete(f"Versión de paquete no soportada: {contenido.get('version')}")
+        return cls(contenido["examen"], contenido["preguntas"], contenido["huella"], contenido["hash"],
+                   contenido["version"])
+
+
+class AlmacenPaquetes:
+    def __init__(self, directorio=DIRECTORIO, cliente=None, max_memoria=MAX_MEMORIA):
+        self.directorio = directorio
+        self.cliente = cliente
+        self.max_memoria = max_memoria
+        self._memoria = OrderedDict()  # (examen_id, huella) -> PaqueteExamen
+        self._lock = threading.Lock()
+        self._construyendo = {}        # examen_id -> Lock, para construir cada paquete una sola vez
+
+    def ruta(self, examen_id, huella):
+        return os.path.join(self.directorio, f"examen_{examen_id}_{huella}.json.gz")
+
+    def obtener(self, examen):
+        # Devuelve (paquete, origen) con origen "memoria", "disco" o "api"
+        clave = (examen["id"], huella_examen(examen))
+        paquete = self._de_memoria(clave)
+        if paquete is not None:
+            return paquete, "memoria"
+
+        # Si varias sesiones abren a la vez el mismo examen, solo una lo construye
+        with self._lock:
+            lock = self._construyendo.setdefault(examen["id"], threading.Lock())
+        with lock:
+            paquete = self._de_memoria(clave)
+            if paquete is not None:
+                return paquete, "memoria"
+            paquete, origen = self._de_disco(*clave), "disco"
+            if paquete is None:
+                paquete, origen = self.construir(examen), "api"
+                self._guardar_en_disco(paquete)
+            self._a_memoria(clave, paquete)
+            return paquete, origen
+
+    def _de_memoria(self, clave):
+        with self._lock:
+            paquete = self._memoria.get(clave)
+            if paquete is not None:
+                self._memoria.move_to_end(clave)
+            return paquete
+
+    def _a_memoria(self, clave, paquete):
+        with self._lock:
+            self._memoria[clave] = paquete
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+
+    def _de_disco(self, examen_id, huella):
+        try:
+            with open(self.ruta(examen_id, huella), "rb") as f:
+                return PaqueteExamen.deserializar(f.read())
+        except (OSError, ValueError, KeyError, ErrorPaquete):
+            # Paquete ausente, corrupto o de otra versión: se reconstruye
+            return None
+
+    def _guardar_en_disco(self, paquete):
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self.ruta(paquete.examen["id"], paquete.huella)
+        # Escribir a un temporal y renombrar para no dejar paquetes a medias
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(paquete.serializar())
+        os.replace(temporal, ruta)
+        # Los paquetes anteriores del mismo examen ya no se usarán
+        prefijo = f"examen_{paquete.examen['id']}_"
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith(prefijo) and nombre.endswith(".json.gz") \
+                    and os.path.join(self.directorio, nombre) != ruta:
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except OSError:
+                    pass
+
+    def construir(self, examen):
+        cliente = self.cliente or obtener_cliente()
+        response = cliente.get(f"examenes/{examen['id']}/preguntas")
+        if response.status_code == 404:
+            # Sin la ruta combinada: preguntas y opciones por separado
+            return PaqueteExamen.construir(examen, self._preguntas_por_separado(cliente, examen))
+        if response.status_code != 200:
+            raise ErrorPaquete(f"Error {response.status_code} al obtener las preguntas del examen "
+                               f"{examen['id']}: {response.text[:200]}")
+        preguntas, _ = normalizar_respuesta("preguntas", response.json())
+        for pregunta in preguntas:
+            pregunta["opciones"], _ = normalizar(pregunta.get("opciones") or [], ESQUEMAS["opcion"])
+        return PaqueteExamen.construir(examen, preguntas)
+
+    def _preguntas_por_separado(self, cliente, examen):
+        response = cliente.get("preguntas")
+        if response.status_code != 200:
+            raise ErrorPaquete(f"Error {response.status_code} al obtener preguntas: {response.text[:200]}")
+        ids = set(examen.get("preguntasIds") or [])
+        preguntas = [p for p in normalizar_respuesta("preguntas", response.json())[0] if p["id"] in ids]
+        respuestas = cliente.get_varios([("opciones", {"pregunta_id": p["id"]}) for p in preguntas])
+        for pregunta, respuesta in zip(preguntas, respuestas):
+            if isinstance(respuesta, Exception) or respuesta.status_code != 200:
+                raise ErrorPaquete(f"No se pudieron obtener las opciones de la pregunta {pregunta['id']}")
+            pregunta["opciones"], _ = normalizar_respuesta("opciones", respuesta.json())
+        return preguntas
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+
+def obtener_paquetes():
+    # Almacén único por proceso, compartido por todas las sesiones
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                _almacen = AlmacenPaquetes()
+    return _almacen
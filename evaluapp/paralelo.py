@@ -0,0 +1,70 @@
+"""Ejecución de análisis por particiones en un pool de procesos.
+
+Las tablas grandes se reparten por el hash de una columna clave (la pregunta,
+el examen...), de modo que todas las filas de un mismo grupo caen en la misma
+partición. Cada partición se procesa en un proceso aparte y los resultados
+parciales se combinan en el proceso principal.
+
+El número de particiones es fijo y no depende del número de procesos, y los
+parciales se combinan siempre en el orden de las particiones: el resultado es
+el mismo con 2 procesos que con 16. Con un solo proceso (el valor por
+defecto) o con tablas pequeñas todo se calcula en el propio proceso, sin
+particionar.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+PROCESOS = int(os.environ.get("EVALUAPP_PROCESOS", 1))
+PARTICIONES = 32
+
+# Por debajo de este número de filas repartir cuesta más de lo que se gana
+MIN_FILAS = 200_000
+
+_procesos = PROCESOS
+_procesos_lock = threading.Lock()
+
+
+def configurar_procesos(procesos):
+    global _procesos
+    with _procesos_lock:
+        _procesos = max(1, procesos or 1)
+    return _procesos
+
+
+def obtener_procesos():
+    return _procesos
+
+
+def usar_procesos(filas, procesos=None):
+    # Procesos que merece la pena usar para una tabla de `filas` filas (1 = en serie)
+    procesos = obtener_procesos() if procesos is None else procesos
+    return procesos if procesos > 1 and filas >= MIN_FILAS else 1
+
+
+def particionar(df, columna, particiones=PARTICIONES):
+    # Divide `df` en como mucho `particiones` tablas según el hash de `columna`,
+    # conservando el orden original de las filas dentro de cada una
+    import pandas as pd
+    destino = pd.util.hash_pandas_object(df[columna], index=False).to_numpy() % particiones
+    return [df[destino == i] for i in range(particiones) if (destino == i).any()]
+
+
+def mapear_particiones(df, columna, funcion, *args, procesos=None, particiones=PARTICIONES):
+    # Aplica `funcion(parte, *args)` a cada partición de `df` y devuelve los
+    # resultados parciales en el orden de las particiones. `funcion` debe
+    # poder importarse desde otro proceso (definida a nivel de módulo).
+    procesos = usar_procesos(len(df), procesos)
+    if procesos == 1:
+        return [funcion(df, *args)]
+    partes = particionar(df, columna, particiones)
+    # "spawn" en todas las plataformas: no hereda los hilos del cliente HTTP
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(procesos, len(partes)), mp_context=contexto) as executor:
+        return list(executor.map(funcion, partes, *[[a] * len(partes) for a in args]))
+
+
+def ordenar_conteos(conteos):
+    # Orden estable de un value_counts: de mayor a menor y, a igualdad, por clave
+    return conteos.sort_index(kind="stable").sort_values(ascending=False, kind="stable")
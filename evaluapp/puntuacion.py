@@ -0,0 +1,224 @@
+"""Motor de puntuación y análisis de ítems sobre los resultados.
+
+Recalcula el puntaje de cada intento a partir de sus respuestas y de las
+opciones marcadas con `esCorrecta`, y obtiene por pregunta el índice de
+dificultad y dos índices de discriminación. Todo el cálculo trabaja sobre una
+tabla larga (intento, pregunta, opción), con una fila por respuesta dada,
+y operaciones vectorizadas de pandas/NumPy, sin bucles de Python por fila.
+"""
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from evaluapp.paralelo import mapear_particiones
+
+# Fracción de intentos que forma el grupo alto y el grupo bajo en el índice
+# de discriminación clásico (Kelley)
+FRACCION_GRUPOS = 0.27
+INTERVALOS_DISTRIBUCION = np.linspace(0, 100, 11)
+
+# Nombres con los que puede llegar cada campo de una respuesta en forma de lista
+ALIAS_PREGUNTA = ("pregunta_id", "preguntaId", "pregunta.id")
+ALIAS_OPCION = ("opcion_id", "opcionId", "opcion.id", "respuestaId")
+ALIAS_EXAMEN = ("examenId", "examen.id", "examen.titulo")
+
+
+class Puntuacion:
+    def __init__(self, intentos, preguntas, distribucion):
+        # intentos: una fila por intento con aciertos, respondidas y puntaje
+        # preguntas: una fila por pregunta con dificultad y discriminación
+        # distribucion: número de intentos por tramo de puntaje
+        self.intentos = intentos
+        self.preguntas = preguntas
+        self.distribucion = distribucion
+
+
+def _primera_columna(df, alias):
+    return next((c for c in alias if c in df.columns), None)
+
+
+def respuestas_largas(resultados):
+    # Tabla (intento, pregunta_id, opcion_id) con una fila por respuesta
+    # dada, a partir de la columna "respuestas" de cada resultado: un mapa
+    # {pregunta: opción} o una lista de pares
+    intentos = resultados["id"] if "id" in resultados.columns else pd.Series(resultados.index, index=resultados.index)
+    partes = []
+
+    columnas_mapa = [c for c in resultados.columns if c.startswith("respuestas.")]
+    if columnas_mapa:
+        # Snapshots antiguos, con el mapa ya aplanado en columnas "respuestas.<id>":
+        # stack descarta las celdas vacías sin crear una fila por pregunta e intento
+        ids_pregunta = pd.to_numeric(pd.Series([c.split(".", 1)[1] for c in columnas_mapa]), errors="coerce")
+        ancho = resultados[columnas_mapa].set_axis(ids_pregunta, axis=1).set_axis(intentos.to_numpy(), axis=0)
+        apiladas = ancho.stack()
+        partes.append(pd.DataFrame({
+            "intento": apiladas.index.get_level_values(0).to_numpy(),
+            "pregunta_id": apiladas.index.get_level_values(1).to_numpy(),
+            "opcion_id": apiladas.to_numpy(),
+        }))
+
+    if "respuestas" in resultados.columns:
+        valores = pd.Series(resultados["respuestas"].to_numpy(), index=intentos.to_numpy())
+        es_mapa = valores.map(lambda v: isinstance(v, dict)).to_numpy(dtype=bool)
+        mapas = valores[es_mapa]
+        if len(mapas):
+            partes.append(pd.DataFrame({
+                "intento": np.repeat(mapas.index.to_numpy(), mapas.map(len).to_numpy()),
+                "pregunta_id": list(chain.from_iterable(mapas.map(dict.keys))),
+                "opcion_id": list(chain.from_iterable(mapas.map(dict.values))),
+            }))
+        serie = valores[~es_mapa].explode().dropna()
+        if len(serie):
+            pares = pd.json_normalize(serie.tolist())
+            columna_pregunta = _primera_columna(pares, ALIAS_PREGUNTA)
+            columna_opcion = _primera_columna(pares, ALIAS_OPCION)
+            if columna_pregunta is not None and columna_opcion is not None:
+                partes.append(pd.DataFrame({
+                    "intento": serie.index.to_numpy(),
+                    "pregunta_id": pares[columna_pregunta].to_numpy(),
+                    "opcion_id": pares[columna_opcion].to_numpy(),
+                }))
+
+    if not partes:
+        return pd.DataFrame({"intento": [], "pregunta_id": [], "opcion_id": []})
+    largo = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+
+    for columna in ("pregunta_id", "opcion_id"):
+        if not pd.api.types.is_numeric_dtype(largo[columna]):
+            largo[columna] = pd.to_numeric(largo[columna], errors="coerce")
+    largo = largo.dropna(subset=["pregunta_id", "opcion_id"])
+    return largo.astype({"pregunta_id": "int64", "opcion_id": "int64"}).reset_index(drop=True)
+
+
+def _es_correcta(opciones):
+    columna = opciones["esCorrecta"]
+    if columna.dtype == bool:
+        return columna
+    # Valores textuales o nulos ("true", "1", None...)
+    return columna.astype(str).str.lower().isin(["true", "1"])
+
+
+def _clave_opciones(opciones):
+    # Por opción: pregunta a la que pertenece y si es correcta
+    return pd.DataFrame({
+        "opcion_id": pd.to_numeric(opciones["id"], errors="coerce"),
+        "pregunta_id": pd.to_numeric(opciones["pregunta_id"], errors="coerce"),
+        "es_correcta": _es_correcta(opciones).to_numpy(),
+    }).dropna(subset=["opcion_id"]).drop_duplicates("opcion_id").set_index("opcion_id")
+
+
+def calcular(resultados, opciones, procesos=None):
+    # Con varios procesos los resultados se reparten por examen: cada intento
+    # y cada ranking por examen quedan enteros en una partición, y por
+    # pregunta solo hay que sumar conteos, así que el resultado es idéntico
+    # al cálculo en serie
+    clave = _clave_opciones(opciones)
+    columna_examen = _primera_columna(resultados, ALIAS_EXAMEN)
+    if columna_examen is None:
+        # Sin examen el ranking es global y necesita todos los intentos
+        parciales = [puntuar_parte(resultados, clave)]
+    else:
+        parciales = mapear_particiones(resultados, columna_examen, puntuar_parte, clave, procesos=procesos)
+
+    intentos = pd.concat([intentos for intentos, _ in parciales]).sort_index()
+    sumas = pd.concat([sumas for _, sumas in parciales]).groupby(level=0).sum()
+    preguntas = _items_desde_sumas(sumas)
+
+    tramos = pd.cut(intentos["puntaje"], INTERVALOS_DISTRIBUCION, include_lowest=True)
+    distribucion = tramos.value_counts(sort=False)
+
+    return Puntuacion(intentos, preguntas, distribucion)
+
+
+def puntuar_parte(resultados, clave):
+    # Intentos puntuados y sumas por pregunta de una partición de resultados
+    largo = respuestas_largas(resultados)
+
+    # Marcar cada respuesta como acierto solo si la opción es correcta y
+    # pertenece de verdad a la pregunta respondida
+    posiciones = clave.index.get_indexer(largo["opcion_id"])
+    encontrada = posiciones >= 0
+    posiciones = np.where(encontrada, posiciones, 0)
+    largo["acierto"] = (encontrada
+                        & clave["es_correcta"].to_numpy(dtype=bool)[posiciones]
+                        & (clave["pregunta_id"].to_numpy()[posiciones] == largo["pregunta_id"].to_numpy())
+                        ).astype("int8")
+
+    # Puntaje por intento
+    por_intento = largo.groupby("intento")["acierto"]
+    intentos = pd.DataFrame({"aciertos": por_intento.sum().astype("int64"), "respondidas": por_intento.size()})
+    intentos["puntaje"] = 100 * intentos["aciertos"] / intentos["respondidas"]
+    intentos = _agregar_contexto(intentos, resultados)
+
+    return intentos, _sumas_items(largo, intentos)
+
+
+def _agregar_contexto(intentos, resultados):
+    # Copiar al intento el examen, el usuario y el puntaje que informó el servidor
+    if "id" not in resultados.columns:
+        contexto = resultados.copy()
+    else:
+        contexto = resultados.drop_duplicates("id").set_index("id")
+    columnas = {
+        "examen": _primera_columna(contexto, ALIAS_EXAMEN),
+        "usuario": _primera_columna(contexto, ("usuario.email", "usuarioId", "usuario.id")),
+        "puntaje_servidor": _primera_columna(contexto, ("puntaje",)),
+    }
+    for nombre, columna in columnas.items():
+        if columna is not None:
+            intentos[nombre] = contexto[columna].reindex(intentos.index).to_numpy()
+    return intentos
+
+
+def _sumas_items(largo, intentos):
+    # Sumas por pregunta de las que salen dificultad y discriminación. Son
+    # conteos y sumas de enteros, que se pueden sumar entre particiones sin
+    # perder precisión.
+    posiciones = intentos.index.get_indexer(largo["intento"])
+    aciertos = intentos["aciertos"].to_numpy()[posiciones]
+
+    # Grupos alto y bajo de Kelley: el 27 % superior y el 27 % inferior de
+    # los intentos, ordenados por puntaje dentro de cada examen cuando se conoce
+    if "examen" in intentos.columns:
+        percentil = intentos.groupby("examen")["puntaje"].rank(pct=True, method="average")
+    else:
+        percentil = intentos["puntaje"].rank(pct=True, method="average")
+    percentil = percentil.to_numpy()[posiciones]
+    altos = (percentil > 1 - FRACCION_GRUPOS).astype("int64")
+    bajos = (percentil <= FRACCION_GRUPOS).astype("int64")
+
+    # Acierto en el ítem frente a los aciertos en el resto del intento
+    x = largo["acierto"].to_numpy(dtype="float64")
+    r = aciertos.astype("float64") - x
+    return pd.DataFrame({
+        "pregunta_id": largo["pregunta_id"].to_numpy(),
+        "respuestas": np.ones(len(largo), dtype="int64"),
+        "aciertos": largo["acierto"].to_numpy(dtype="int64"),
+        "altos": altos, "aciertos_altos": altos * x.astype("int64"),
+        "bajos": bajos, "aciertos_bajos": bajos * x.astype("int64"),
+        "x": x, "r": r, "xr": x * r, "xx": x * x, "rr": r * r,
+    }).groupby("pregunta_id").sum()
+
+
+def _items_desde_sumas(sumas):
+    # Dificultad: proporción de aciertos de cada pregunta
+    preguntas = pd.DataFrame({
+        "respuestas": sumas["respuestas"],
+        "dificultad": sumas["aciertos"] / sumas["respuestas"],
+    })
+
+    # Discriminación de Kelley: diferencia de aciertos entre el grupo alto y
+    # el bajo (sin valor si la pregunta no tiene respuestas en alguno)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        preguntas["discriminacion"] = (sumas["aciertos_altos"] / sumas["altos"].where(sumas["altos"] > 0)
+                                       - sumas["aciertos_bajos"] / sumas["bajos"].where(sumas["bajos"] > 0))
+
+    # Correlación punto-biserial corregida, a partir de las sumas agrupadas
+    n = preguntas["respuestas"].astype("float64")
+    covarianza = n * sumas["xr"] - sumas["x"] * sumas["r"]
+    varianza = (n * sumas["xx"] - sumas["x"] ** 2) * (n * sumas["rr"] - sumas["r"] ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        preguntas["correlacion_item_resto"] = covarianza / np.sqrt(varianza.where(varianza > 0))
+
+    return preguntas
@@ -0,0 +1,169 @@
+"""Copia en memoria, siempre disponible, de las colecciones de referencia.
+
+Preguntas, exámenes y perfiles de profesor cambian poco. Un hilo de fondo
+mantiene una copia de cada colección y la revalida periódicamente con
+peticiones condicionales (`If-None-Match` / `If-Modified-Since`): si nada
+cambió el servidor responde 304 sin cuerpo. Las páginas leen la copia al
+instante aunque esté algo vencida (stale-while-revalidate); solo la primera
+lectura de una colección, antes de tenerla, espera a la red.
+"""
+import logging
+import threading
+import time
+
+import requests
+
+from evaluapp.cliente import obtener_cliente
+from evaluapp.normalizacion import normalizar_respuesta
+
+logger = logging.getLogger("evaluapp.referencia")
+
+# endpoint -> segundos tras los que se revalida la copia
+INTERVALOS = {
+    "examenes": 60,
+    "preguntas": 300,
+    "teacher/profile": 600,
+}
+# Cada cuánto se despierta el hilo para ver qué colecciones tocan
+INTERVALO_REVISION = 5
+
+
+class Coleccion:
+    def __init__(self, endpoint, intervalo):
+        self.endpoint = endpoint
+        self.intervalo = intervalo
+        self.datos = None
+        self.etag = None
+        self.ultima_modificacion = None
+        self.validado_en = None    # time.monotonic() de la última respuesta 200 o 304
+        self.cambiado_en = None    # time.time() de la última versión nueva
+        self.vencida = False       # forzar revalidación antes de la próxima lectura
+        self.error = None
+        self.lock = threading.Lock()
+
+    @property
+    def edad(self):
+        # Segundos desde la última vez que se confirmó con el servidor
+        return None if self.validado_en is None else time.monotonic() - self.validado_en
+
+    def necesita_revalidar(self):
+        return self.datos is None or self.vencida or self.edad >= self.intervalo
+
+
+class RefrescadorReferencia:
+    def __init__(self, cliente=None, intervalos=None, intervalo_revision=INTERVALO_REVISION):
+        self.cliente = cliente
+        self.colecciones = {endpoint: Coleccion(endpoint, intervalo)
+                            for endpoint, intervalo in (intervalos or INTERVALOS).items()}
+        self.intervalo_revision = intervalo_revision
+        self._hilo = None
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+
+    def gestiona(self, endpoint):
+        return endpoint in self.colecciones
+
+    def obtener(self, endpoint):
+        # Copia actual de la colección, aunque esté vencida. Solo si todavía
+        # no se tiene se descarga en el momento (y puede lanzar la excepción).
+        coleccion = self.colecciones[endpoint]
+        if coleccion.datos is None or coleccion.vencida:
+            self.revalidar(endpoint, lanzar=coleccion.datos is None)
+        elif coleccion.necesita_revalidar():
+            self._despertar.set()
+        return coleccion.datos
+
+    def revalidar(self, endpoint, lanzar=False):
+        # Petición condicional; devuelve True si llegó una versión nueva
+        coleccion = self.colecciones[endpoint]
+        with coleccion.lock:
+            if coleccion.datos is not None and not coleccion.necesita_revalidar():
+                return False  # Otro hilo acaba de revalidarla
+            cabeceras = {}
+            if coleccion.etag:
+                cabeceras["If-None-Match"] = coleccion.etag
+            if coleccion.ultima_modificacion:
+                cabeceras["If-Modified-Since"] = coleccion.ultima_modificacion
+            try:
+                response = (self.cliente or obtener_cliente()).get(endpoint, headers=cabeceras)
+                if response.status_code == 304 and coleccion.datos is not None:
+                    cambio = False
+                elif response.status_code == 200:
+                    datos, _ = normalizar_respuesta(endpoint, response.json())
+                    coleccion.datos = datos
+                    coleccion.etag = response.headers.get("ETag")
+                    coleccion.ultima_modificacion = response.headers.get("Last-Modified")
+                    coleccion.cambiado_en = time.time()
+                    cambio = True
+                else:
+                    raise requests.exceptions.HTTPError(
+                        f"Error {response.status_code} al obtener {endpoint}: {response.text[:200]}")
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # Se sigue sirviendo la copia anterior; se reintenta en la próxima revisión
+                coleccion.error = str(e)
+                logger.warning("No se pudo revalidar %s: %s", endpoint, e)
+                if lanzar:
+                    raise
+                return False
+            coleccion.validado_en = time.monotonic()
+            coleccion.vencida = False
+            coleccion.error = None
+            return cambio
+
+    def invalidar(self, endpoint):
+        # Tras un cambio propio (p. ej. crear un examen) la próxima lectura
+        # revalida antes de responder, con una petición condicional
+        if endpoint in self.colecciones:
+            self.colecciones[endpoint].vencida = True
+
+    def estado(self):
+        # Edad y versión de cada colección, para el panel de depuración
+        return [{
+            "coleccion": c.endpoint,
+            "elementos": len(c.datos) if isinstance(c.datos, list) else None,
+            "edad_s": None if c.edad is None else round(c.edad, 1),
+            "intervalo_s": c.intervalo,
+            "etag": c.etag,
+            "error": c.error,
+        } for c in self.colecciones.values()]
+
+    def iniciar(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, daemon=True, name="evaluapp-referencia")
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            self._despertar.clear()
+            for endpoint, coleccion in self.colecciones.items():
+                # Solo las colecciones que ya se han pedido alguna vez
+                if coleccion.datos is not None and coleccion.necesita_revalidar():
+                    try:
+                        self.revalidar(endpoint)
+                    except Exception:
+                        # El hilo no debe morir: se reintenta en la siguiente vuelta
+                        logger.exception("Error al revalidar %s", endpoint)
+            self._despertar.wait(self.intervalo_revision)
+
+
+_refrescador = None
+_refrescador_lock = threading.Lock()
+
+
+def obtener_refrescador():
+    # Refrescador único por proceso, con su hilo ya en marcha
+    global _refrescador
+    if _refrescador is None:
+        with _refrescador_lock:
+            if _refrescador is None:
+                _refrescador = RefrescadorReferencia()
+                _refrescador.iniciar()
+    return _refrescador
@@ -0,0 +1,76 @@
+"""Índices en memoria sobre las colecciones descargadas de la API.
+
+Se construyen una sola vez por descarga y permiten resolver exámenes,
+preguntas y opciones por id en O(1) en lugar de recorrer las listas.
+"""
+import threading
+from collections import OrderedDict
+
+from evaluapp.busqueda import IndicePreguntas
+
+
+class Repositorio:
+    def __init__(self, examenes=(), preguntas=(), opciones_por_pregunta=None):
+        self.examenes = list(examenes)
+        self.preguntas = list(preguntas)
+        self.examenes_por_id = {e["id"]: e for e in self.examenes}
+        self.preguntas_por_id = {p["id"]: p for p in self.preguntas}
+        self.opciones_por_pregunta = {}
+        self.opciones_por_id = {}  # pregunta_id -> {opcion_id: opcion}
+        self._indice = None
+        self.agregar_opciones(opciones_por_pregunta or {})
+
+    @property
+    def indice(self):
+        # Índice de texto de las preguntas; se construye en la primera búsqueda
+        if self._indice is None:
+            self._indice = IndicePreguntas(self.preguntas)
+        return self._indice
+
+    def agregar_opciones(self, opciones_por_pregunta):
+        for pregunta_id, opciones in opciones_por_pregunta.items():
+            self.opciones_por_pregunta[pregunta_id] = opciones
+            self.opciones_por_id[pregunta_id] = {o["id"]: o for o in opciones}
+
+    def examen(self, examen_id):
+        return self.examenes_por_id.get(examen_id)
+
+    def pregunta(self, pregunta_id):
+        return self.preguntas_por_id.get(pregunta_id)
+
+    def preguntas_de_examen(self, examen_id):
+        # Preguntas del examen en el orden de preguntasIds, omitiendo las que
+        # ya no existen en el banco
+        examen = self.examen(examen_id)
+        if not examen:
+            return []
+        return [self.preguntas_por_id[p] for p in examen.get("preguntasIds") or []
+                if p in self.preguntas_por_id]
+
+    def opciones(self, pregunta_id):
+        return self.opciones_por_pregunta.get(pregunta_id, [])
+
+    def opcion(self, pregunta_id, opcion_id):
+        return self.opciones_por_id.get(pregunta_id, {}).get(opcion_id)
+
+
+# Últimos índices construidos, por identidad de las listas de origen
+MAX_REPOSITORIOS = 4
+_recientes = OrderedDict()
+_recientes_lock = threading.Lock()
+
+
+def obtener_repositorio(examenes=(), preguntas=()):
+    # Reutiliza el índice mientras las listas sean las mismas (las que sirve
+    # la caché); solo se reconstruye cuando llega una descarga nueva
+    clave = (id(examenes), id(preguntas))
+    with _recientes_lock:
+        if clave in _recientes:
+            _recientes.move_to_end(clave)
+            return _recientes[clave][0]
+        repositorio = Repositorio(examenes, preguntas)
+        # Guardar también las listas evita que otra lista reutilice sus ids
+        _recientes[clave] = (repositorio, examenes, preguntas)
+        while len(_recientes) > MAX_REPOSITORIOS:
+            _recientes.popitem(last=False)
+        return repositorio
@@ -0,0 +1,248 @@
+"""Servidor local que imita la API de Evaluapp con datos sintéticos.
+
+Permite medir el cliente, la aplicación y los scripts sin tocar producción:
+
+    python -m evaluapp.servidor_local --puerto 8000 --preguntas 5000 --resultados 100000
+    EVALUAPP_API_URL=http://127.0.0.1:8000/api streamlit run app/app.py
+
+Solo usa la biblioteca estándar. Atiende cada petición en su propio hilo.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from evaluapp.sintetico import construir_resultado, generar_datos
+
+PREFIJO = "/api"
+
+
+class EstadoServidor:
+    # Datos en memoria compartidos por todos los hilos del servidor
+    def __init__(self, datos, latencia=0.0):
+        self.latencia = latencia
+        self.lock = threading.Lock()
+        self.usuarios = datos["usuarios"]
+        self.profesores = datos["profesores"]
+        self.preguntas = datos["preguntas"]
+        self.opciones = datos["opciones"]
+        self.examenes = datos["examenes"]
+        self.resultados = datos["resultados"]
+        self.preguntas_por_id = {p["id"]: p for p in self.preguntas}
+        self.examenes_por_id = {e["id"]: e for e in self.examenes}
+        self.usuarios_por_id = {u["id"]: u for u in self.usuarios}
+        self.idempotencia = {}  # Idempotency-Key -> respuesta ya creada
+
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como el backend real
+    estado = None
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, estado_http, cuerpo):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        etag = None
+        if self.command == "GET" and estado_http == 200:
+            # ETag del contenido: si el cliente ya lo tiene se responde 304 sin cuerpo
+            etag = f'"{hashlib.sha1(datos).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+        self.send_response(estado_http)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _ruta(self):
+        partes = urlparse(self.path)
+        ruta = partes.path
+        if ruta.startswith(PREFIJO):
+            ruta = ruta[len(PREFIJO):]
+        return [p for p in ruta.split("/") if p], parse_qs(partes.query)
+
+    def _lista(self, items, query):
+        # Con ?page=&size= responde una página al estilo Spring; sin ellos, la lista completa
+        if "page" not in query and "size" not in query:
+            return items
+        pagina = int(query.get("page", ["0"])[0])
+        tamano = max(1, int(query.get("size", ["20"])[0]))
+        contenido = items[pagina * tamano:(pagina + 1) * tamano]
+        total_paginas = (len(items) + tamano - 1) // tamano
+        return {
+            "content": contenido,
+            "number": pagina,
+            "size": tamano,
+            "totalElements": len(items),
+            "totalPages": total_paginas,
+            "last": pagina + 1 >= total_paginas,
+        }
+
+    def do_GET(self):
+        if self.estado.latencia:
+            time.sleep(self.estado.latencia)
+        segmentos, query = self._ruta()
+        estado = self.estado
+
+        if segmentos == ["examenes"]:
+            return self._responder(200, self._lista(estado.examenes, query))
+        if segmentos == ["preguntas"]:
+            return self._responder(200, self._lista(estado.preguntas, query))
+        if segmentos == ["resultados"]:
+            resultados = estado.resultados
+            if "desdeId" in query:
+                desde = int(query["desdeId"][0])
+                resultados = [r for r in resultados if r["id"] > desde]
+            return self._responder(200, self._lista(resultados, query))
+        if segmentos == ["teacher", "profile"]:
+            return self._responder(200, estado.profesores)
+        if segmentos == ["admin", "users"]:
+            return self._responder(200, self._lista(estado.usuarios, query))
+        if segmentos == ["opciones"] and "pregunta_id" in query:
+            return self._responder(200, estado.opciones.get(int(query["pregunta_id"][0]), []))
+        if len(segmentos) == 3 and segmentos[:2] == ["opciones", "pregunta"]:
+            return self._responder(200, estado.opciones.get(int(segmentos[2]), []))
+        if len(segmentos) == 3 and segmentos[0] == "examenes" and segmentos[2] == "preguntas":
+            examen = estado.examenes_por_id.get(int(segmentos[1]))
+            if examen is None:
+                return self._responder(404, {"message": "Examen no encontrado"})
+            # Con la forma de la API real: el texto va en "pregunta", no en "textoPregunta"
+            return self._responder(200, [
+                dict({k: v for k, v in estado.preguntas_por_id[p].items() if k != "textoPregunta"},
+                     pregunta=estado.preguntas_por_id[p]["textoPregunta"], opciones=estado.opciones.get(p, []))
+                for p in examen["preguntasIds"] if p in estado.preguntas_por_id
+            ])
+        self._responder(404, {"message": f"Ruta no encontrada: {self.path}"})
+
+    def do_POST(self):
+        if self.estado.latencia:
+            time.sleep(self.estado.latencia)
+        segmentos, _ = self._ruta()
+        longitud = int(self.headers.get("Content-Length") or 0)
+        try:
+            cuerpo = json.loads(self.rfile.read(longitud) or b"{}")
+        except json.JSONDecodeError:
+            return self._responder(400, {"message": "JSON no válido"})
+
+        clave = self.headers.get("Idempotency-Key")
+        # Comprobar la clave y registrar el nuevo recurso bajo el mismo lock:
+        # dos reintentos simultáneos con la misma clave crean un solo registro
+        with self.estado.lock:
+            if clave is not None and clave in self.estado.idempotencia:
+                # Reintento de un envío ya procesado: misma respuesta, sin duplicar
+                estado_http, respuesta = 200, self.estado.idempotencia[clave]
+            elif segmentos in (["examenes"], ["resultados"]):
+                try:
+                    if segmentos == ["examenes"]:
+                        estado_http, respuesta = 201, self._crear_examen(cuerpo)
+                    else:
+                        estado_http, respuesta = self._crear_resultado(cuerpo)
+                except (TypeError, ValueError, KeyError, AttributeError) as e:
+                    # Cuerpo incompleto o con tipos erróneos: responder 400 en vez de cortar la conexión
+                    estado_http, respuesta = 400, {"message": "Cuerpo no válido",
+                                                   "detail": f"{type(e).__name__}: {e}"}
+            else:
+                estado_http, respuesta = 404, {"message": f"Ruta no encontrada: {self.path}"}
+            if clave is not None and estado_http == 201:
+                self.estado.idempotencia[clave] = respuesta
+        self._responder(estado_http, respuesta)
+
+    # Los _crear_* se llaman con el lock del estado tomado
+
+    def _crear_examen(self, cuerpo):
+        examen = dict(cuerpo, id=len(self.estado.examenes) + 1)
+        self.estado.examenes.append(examen)
+        self.estado.examenes_por_id[examen["id"]] = examen
+        return examen
+
+    def _crear_resultado(self, cuerpo):
+        # Acepta tanto el formato de la app ({examenId, respuestas: {pregunta: opción}})
+        # como el del simulador ({examen_id, usuario_id, resultados: [...]})
+        examen_id = cuerpo.get("examenId", cuerpo.get("examen_id"))
+        examen = self.estado.examenes_por_id.get(int(examen_id)) if examen_id is not None else None
+        if examen is None:
+            return 400, {"message": "Examen no válido", "detail": f"examenId={examen_id}"}
+        respuestas = cuerpo.get("respuestas")
+        if respuestas is None:
+            respuestas = {str(r["pregunta_id"]): r["opcion_id"] for r in cuerpo.get("resultados", [])}
+        usuario = self.estado.usuarios_por_id.get(cuerpo.get("usuario_id", cuerpo.get("usuarioId")))
+        resultado = construir_resultado(len(self.estado.resultados) + 1, examen, usuario,
+                                        respuestas, self.estado.opciones, datetime.now())
+        self.estado.resultados.append(resultado)
+        return 201, resultado
+
+
+def crear_servidor(host="127.0.0.1", puerto=0, latencia=0.0, **escala):
+    # Devuelve el servidor sin arrancar; con puerto 0 el sistema elige uno libre
+    estado = EstadoServidor(generar_datos(**escala), latencia)
+    manejador = type("Manejador", (ManejadorAPI,), {"estado": estado})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def url_base(servidor):
+    host, puerto = servidor.server_address[:2]
+    return f"http://{host}:{puerto}{PREFIJO}"
+
+
+def iniciar_en_segundo_plano(**opciones):
+    servidor = crear_servidor(**opciones)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    return servidor
+
+
+def agregar_argumentos_escala(parser):
+    parser.add_argument("--examenes", type=int, default=20)
+    parser.add_argument("--preguntas", type=int, default=500)
+    parser.add_argument("--opciones-por-pregunta", type=int, default=4)
+    parser.add_argument("--preguntas-por-examen", type=int, default=20)
+    parser.add_argument("--resultados", type=int, default=2000)
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--latencia-ms", type=float, default=0,
+                        help="retardo artificial por petición, para imitar la red")
+
+
+def escala_desde_argumentos(args):
+    return {
+        "examenes": args.examenes,
+        "preguntas": args.preguntas,
+        "opciones_por_pregunta": args.opciones_por_pregunta,
+        "preguntas_por_examen": args.preguntas_por_examen,
+        "resultados": args.resultados,
+        "usuarios": args.usuarios,
+        "semilla": args.semilla,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local de pruebas de Evaluapp")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    agregar_argumentos_escala(parser)
+    args = parser.parse_args()
+
+    servidor = crear_servidor(args.host, args.puerto, args.latencia_ms / 1000, **escala_desde_argumentos(args))
+    print(f"Sirviendo datos sintéticos en {url_base(servidor)} (Ctrl+C para salir)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Simulación de estudiantes realizando un examen contra la API.
+
+Reproduce el flujo de un estudiante (listar exámenes, pedir las preguntas del
+examen con sus opciones y enviar el resultado) con muchos estudiantes
+virtuales a la vez, y mide latencias, envíos por segundo y errores.
+
+Cada estudiante tiene una habilidad (probabilidad de acertar) tomada de una
+distribución normal, deja alguna pregunta sin responder y piensa un tiempo
+por pregunta con distribución log-normal antes de enviar. Si las opciones no
+indican cuál es la correcta se elige al azar. Con la misma semilla la
+simulación elige siempre las mismas respuestas.
+"""
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from evaluapp.envios import CABECERA_IDEMPOTENCIA
+from evaluapp.metricas import percentil
+
+PASOS = ("examenes", "preguntas", "envio", "total")
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Comportamiento:
+    # Cómo responden los estudiantes virtuales
+    def __init__(self, habilidad=0.65, dispersion=0.15, omitir=0.02, pensar=0.0, rampa=0.0, semilla=None):
+        self.habilidad = habilidad      # probabilidad media de acertar una pregunta
+        self.dispersion = dispersion    # desviación típica de la habilidad entre estudiantes
+        self.omitir = omitir            # probabilidad de dejar una pregunta sin responder
+        self.pensar = pensar            # segundos (mediana) que se piensa cada pregunta
+        self.rampa = rampa              # segundos en los que se reparten las llegadas
+        self.semilla = semilla
+
+    def generador(self, numero):
+        # Generador propio de cada estudiante: el resultado no depende del
+        # orden en que los hilos lleguen a ejecutarse
+        return random.Random(None if self.semilla is None else self.semilla * 1_000_003 + numero)
+
+    def tiempo_pensando(self, rng, preguntas):
+        if self.pensar <= 0:
+            return 0.0
+        return sum(rng.lognormvariate(math.log(self.pensar), 0.5) for _ in range(preguntas))
+
+
+class Informe:
+    def __init__(self):
+        self.latencias = defaultdict(list)  # paso -> segundos
+        self.errores = Counter()             # "paso: motivo" -> veces
+        self.completados = 0
+        self.fallidos = 0
+        self.respuestas = Counter()          # "acertadas" / "falladas" / "omitidas" / "sin_clave"
+        self.duracion = 0.0
+        self._lock = threading.Lock()
+
+    def registrar(self, paso, segundos):
+        with self._lock:
+            self.latencias[paso].append(segundos)
+
+    def fallo(self, paso, motivo):
+        with self._lock:
+            self.errores[f"{paso}: {motivo}"] += 1
+
+    def contar_respuestas(self, conteo):
+        with self._lock:
+            self.respuestas.update(conteo)
+
+    @property
+    def total(self):
+        return self.completados + self.fallidos
+
+    def resumen(self):
+        resumen = {
+            "estudiantes": self.total,
+            "completados": self.completados,
+            "fallidos": self.fallidos,
+            "duracion_s": self.duracion,
+            "envios_por_segundo": self.completados / self.duracion if self.duracion else 0.0,
+            "tasa_error": self.fallidos / self.total if self.total else 0.0,
+            "errores": dict(self.errores),
+            "respuestas": dict(self.respuestas),
+            "latencias_ms": {},
+        }
+        for paso, valores in self.latencias.items():
+            ordenados = sorted(valores)
+            resumen["latencias_ms"][paso] = dict(
+                {f"p{p}": percentil(ordenados, p) * 1000 for p in PERCENTILES}, n=len(ordenados))
+        return resumen
+
+    def imprimir(self):
+        resumen = self.resumen()
+        print(f"\nEstudiantes simulados: {resumen['estudiantes']}")
+        print(f"Completados: {resumen['completados']}  Fallidos: {resumen['fallidos']} "
+              f"(tasa de error {resumen['tasa_error']:.1%})")
+        print(f"Duración: {resumen['duracion_s']:.2f} s  Envíos/s: {resumen['envios_por_segundo']:.2f}")
+        respondidas = self.respuestas["acertadas"] + self.respuestas["falladas"]
+        if respondidas:
+            print(f"Respuestas: {respondidas} ({self.respuestas['acertadas'] / respondidas:.1%} acertadas), "
+                  f"{self.respuestas['omitidas']} omitidas")
+        elif self.respuestas["sin_clave"]:
+            print(f"Respuestas: {self.respuestas['sin_clave']} al azar (las opciones no indican la correcta), "
+                  f"{self.respuestas['omitidas']} omitidas")
+        if resumen["latencias_ms"]:
+            print("\nLatencia por paso (ms, sin tiempo de pensar):")
+        for paso in [p for p in PASOS if p in resumen["latencias_ms"]] + \
+                [p for p in resumen["latencias_ms"] if p not in PASOS]:
+            valores = resumen["latencias_ms"][paso]
+            print(f"  {paso:<10} " + "  ".join(f"{k}={v:8.1f}" for k, v in valores.items() if k != "n")
+                  + f"  (n={valores['n']})")
+        if self.errores:
+            print("\nErrores:")
+            for motivo, veces in self.errores.most_common():
+                print(f"  {veces:>5}  {motivo}")
+
+    def guardar(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.resumen(), f, ensure_ascii=False, indent=2)
+
+
+def _medir(informe, paso, funcion):
+    # Devuelve (response, segundos); response es None si la petición no llegó a completarse
+    inicio = time.perf_counter()
+    try:
+        response = funcion()
+    except requests.exceptions.RequestException as e:
+        informe.fallo(paso, type(e).__name__)
+        return None, 0.0
+    segundos = time.perf_counter() - inicio
+    informe.registrar(paso, segundos)
+    return response, segundos
+
+
+def elegir_respuestas(preguntas, rng, habilidad, omitir):
+    # Devuelve [(pregunta_id, opcion_id)] y el conteo de aciertos, fallos y omisiones
+    elegidas = []
+    conteo = Counter()
+    for pregunta in preguntas:
+        opciones = pregunta.get("opciones") or []
+        if not opciones or rng.random() < omitir:
+            conteo["omitidas"] += 1
+            continue
+        correctas = [o for o in opciones if o.get("esCorrecta") is True]
+        incorrectas = [o for o in opciones if o.get("esCorrecta") is not True]
+        if not correctas:
+            opcion = rng.choice(opciones)
+            conteo["sin_clave"] += 1
+        elif rng.random() < habilidad or not incorrectas:
+            opcion = rng.choice(correctas)
+            conteo["acertadas"] += 1
+        else:
+            opcion = rng.choice(incorrectas)
+            conteo["falladas"] += 1
+        elegidas.append((pregunta["id"], opcion["id"]))
+    return elegidas, conteo
+
+
+def realizar_examen_simulado(cliente, informe, examen_id=None, usuario_id=1, comportamiento=None, rng=None):
+    comportamiento = comportamiento or Comportamiento(habilidad=1.0, dispersion=0.0, omitir=0.0)
+    rng = rng or comportamiento.generador(usuario_id)
+    red = 0.0  # segundos de red, sin contar el tiempo de pensar
+
+    # 1. Obtener exámenes disponibles
+    response, segundos = _medir(informe, "examenes", lambda: cliente.get("examenes"))
+    if response is None or response.status_code != 200:
+        if response is not None:
+            informe.fallo("examenes", f"HTTP {response.status_code}")
+        return False
+    red += segundos
+    examenes = response.json() or []
+    if examen_id is None:
+        if not examenes:
+            informe.fallo("examenes", "sin exámenes")
+            return False
+        examen_id = rng.choice(examenes)["id"]
+
+    # 2. Obtener preguntas del examen con sus opciones
+    response, segundos = _medir(informe, "preguntas", lambda: cliente.get(f"examenes/{examen_id}/preguntas"))
+    if response is None or response.status_code != 200:
+        if response is not None:
+            informe.fallo("preguntas", f"HTTP {response.status_code}")
+        return False
+    red += segundos
+    preguntas = response.json() or []
+
+    # 3. Responder: cada estudiante acierta según su habilidad y piensa cada pregunta
+    habilidad = min(1.0, max(0.0, rng.gauss(comportamiento.habilidad, comportamiento.dispersion)))
+    elegidas, conteo = elegir_respuestas(preguntas, rng, habilidad, comportamiento.omitir)
+    informe.contar_respuestas(conteo)
+    pensar = comportamiento.tiempo_pensando(rng, len(preguntas))
+    if pensar:
+        time.sleep(pensar)
+
+    # 4. Enviar resultados, con clave de idempotencia como la app
+    resultado_data = {
+        "examen_id": examen_id,
+        "usuario_id": usuario_id,
+        "resultados": [{"pregunta_id": p, "opcion_id": o} for p, o in elegidas],
+    }
+    cabeceras = {CABECERA_IDEMPOTENCIA: str(uuid.uuid4())}
+    response, segundos = _medir(informe, "envio",
+                                 lambda: cliente.post("resultados", json=resultado_data,
+                                                     headers=cabeceras))
+    if response is None or response.status_code not in (200, 201):
+        if response is not None:
+            informe.fallo("envio", f"HTTP {response.status_code}")
+        return False
+    red += segundos
+    informe.registrar("total", red)
+    return True
+
+
+def ejecutar_carga(cliente, estudiantes, concurrencia, examen_id=None, comportamiento=None):
+    comportamiento = comportamiento or Comportamiento()
+    informe = Informe()
+    inicio = time.perf_counter()
+
+    def estudiante(numero):
+        # Las llegadas se reparten de forma uniforme a lo largo de la rampa
+        if comportamiento.rampa and estudiantes > 1:
+            espera = inicio + comportamiento.rampa * (numero - 1) / (estudiantes - 1) - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+        return realizar_examen_simulado(cliente, informe, examen_id, usuario_id=numero,
+                                        comportamiento=comportamiento,
+                                        rng=comportamiento.generador(numero))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrencia)) as executor:
+        for exito in executor.map(estudiante, range(1, estudiantes + 1)):
+            if exito:
+                informe.completados += 1
+            else:
+                informe.fallidos += 1
+    informe.duracion = time.perf_counter() - inicio
+    return informe
+
+
+def agregar_argumentos_simulacion(parser):
+    parser.add_argument("--estudiantes", type=int, default=40)
+    parser.add_argument("--concurrencia", type=int, default=None,
+                        help="estudiantes simultáneos como máximo (por defecto, todos)")
+    parser.add_argument("--examen-id", type=int, default=None,
+                        help="examen a realizar (por defecto, uno al azar por estudiante)")
+    parser.add_argument("--habilidad", type=float, default=0.65,
+                        help="probabilidad media de acertar cada pregunta")
+    parser.add_argument("--dispersion", type=float, default=0.15,
+                        help="desviación típica de la habilidad entre estudiantes")
+    parser.add_argument("--omitir", type=float, default=0.02,
+                        help="probabilidad de dejar una pregunta sin responder")
+    parser.add_argument("--pensar", type=float, default=0.0,
+                        help="segundos que se piensa cada pregunta (mediana, log-normal)")
+    parser.add_argument("--rampa", type=float, default=0.0,
+                        help="segundos en los que se reparten las llegadas de los estudiantes")
+    parser.add_argument("--salida-json", default=None, help="guardar el resumen en este archivo JSON")
+
+
+def comportamiento_desde_argumentos(args, semilla=None):
+    return Comportamiento(habilidad=args.habilidad, dispersion=args.dispersion, omitir=args.omitir,
+                          pensar=args.pensar, rampa=args.rampa, semilla=semilla)
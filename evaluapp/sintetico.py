@@ -0,0 +1,124 @@
+"""Generadores de datos sintéticos con la forma de la API de Evaluapp.
+
+Sirven para poblar el servidor local de pruebas y para los benchmarks, a la
+escala que se necesite y de forma reproducible (con semilla).
+"""
+import random
+from datetime import datetime, timedelta
+
+TIPOS_PREGUNTA = ["SELECCION_MULTIPLE", "VERDADERO_FALSO", "UNICA_RESPUESTA"]
+ROLES = ["STUDENT", "TEACHER", "ADMIN"]
+PESOS_ROLES = [0.85, 0.13, 0.02]
+PALABRAS = [
+    "álgebra", "función", "derivada", "integral", "célula", "energía", "historia",
+    "independencia", "fracción", "ecuación", "gramática", "verbo", "planeta",
+    "química", "átomo", "geografía", "río", "continente", "literatura", "poema",
+]
+
+
+def _texto(rng, palabras=6):
+    return " ".join(rng.choice(PALABRAS) for _ in range(palabras)).capitalize()
+
+
+def generar_usuarios(n, rng):
+    return [{
+        "id": i,
+        "name": f"Nombre{i}",
+        "lastName": f"Apellido{i}",
+        "email": f"usuario{i}@evaluapp.test",
+        "role": rng.choices(ROLES, PESOS_ROLES)[0],
+    } for i in range(1, n + 1)]
+
+
+def generar_preguntas(n, opciones_por_pregunta, rng):
+    preguntas = []
+    opciones = {}
+    siguiente_opcion = 1
+    for i in range(1, n + 1):
+        preguntas.append({
+            "id": i,
+            "textoPregunta": f"{_texto(rng)}?",
+            "tipoPregunta": rng.choice(TIPOS_PREGUNTA),
+        })
+        correcta = rng.randrange(opciones_por_pregunta)
+        opciones[i] = [{
+            "id": siguiente_opcion + k,
+            "textoOpcion": _texto(rng, 3),
+            "esCorrecta": k == correcta,
+            "preguntaId": i,
+        } for k in range(opciones_por_pregunta)]
+        siguiente_opcion += opciones_por_pregunta
+    return preguntas, opciones
+
+
+def generar_examenes(n, preguntas, profesores, preguntas_por_examen, rng):
+    inicio = datetime(2024, 1, 1, 8, 0)
+    examenes = []
+    for i in range(1, n + 1):
+        fecha_inicio = inicio + timedelta(days=rng.randrange(365), hours=rng.randrange(10))
+        creador = rng.choice(profesores) if profesores else None
+        examenes.append({
+            "id": i,
+            "titulo": f"Examen {i}: {_texto(rng, 2)}",
+            "descripcion": _texto(rng, 10),
+            "fechaInicio": fecha_inicio.isoformat(),
+            "fechaFin": (fecha_inicio + timedelta(minutes=rng.choice([30, 60, 90, 120]))).isoformat(),
+            "preguntasIds": [p["id"] for p in rng.sample(preguntas, min(preguntas_por_examen, len(preguntas)))],
+            "creadorId": creador["id"] if creador else None,
+            "creadorNombre": f"{creador['name']} {creador['lastName']}" if creador else None,
+        })
+    return examenes
+
+
+def generar_resultados(n, examenes, usuarios, opciones, rng, prob_correcta=0.6):
+    resultados = []
+    estudiantes = [u for u in usuarios if u["role"] == "STUDENT"] or usuarios
+    for i in range(1, n + 1):
+        examen = rng.choice(examenes)
+        usuario = rng.choice(estudiantes)
+        respuestas = {}
+        for pregunta_id in examen["preguntasIds"]:
+            candidatas = opciones[pregunta_id]
+            if rng.random() < prob_correcta:
+                elegida = next(o for o in candidatas if o["esCorrecta"])
+            else:
+                elegida = rng.choice(candidatas)
+            respuestas[str(pregunta_id)] = elegida["id"]
+        resultados.append(construir_resultado(i, examen, usuario, respuestas, opciones,
+                                              datetime.fromisoformat(examen["fechaFin"])))
+    return resultados
+
+
+def construir_resultado(resultado_id, examen, usuario, respuestas, opciones, fecha=None):
+    # Mismo formato que devuelve /resultados, con el puntaje calculado
+    correctas = {o["id"] for pregunta_id in examen["preguntasIds"]
+                 for o in opciones.get(pregunta_id, []) if o["esCorrecta"]}
+    aciertos = sum(1 for opcion_id in respuestas.values() if int(opcion_id) in correctas)
+    total = len(examen["preguntasIds"]) or 1
+    return {
+        "id": resultado_id,
+        "puntaje": round(100 * aciertos / total, 2),
+        "fecha": (fecha or datetime.now()).isoformat(),
+        "usuario": {"id": usuario["id"], "email": usuario["email"]} if usuario else None,
+        "examen": {"id": examen["id"], "titulo": examen["titulo"]},
+        "respuestas": dict(respuestas),
+    }
+
+
+def generar_datos(examenes=20, preguntas=500, opciones_por_pregunta=4, resultados=2000,
+                  usuarios=200, preguntas_por_examen=20, semilla=42):
+    rng = random.Random(semilla)
+    lista_usuarios = generar_usuarios(usuarios, rng)
+    profesores = [u for u in lista_usuarios if u["role"] == "TEACHER"] or lista_usuarios[:1]
+    lista_preguntas, opciones = generar_preguntas(preguntas, opciones_por_pregunta, rng)
+    lista_examenes = generar_examenes(examenes, lista_preguntas, profesores, preguntas_por_examen, rng)
+    lista_resultados = generar_resultados(resultados, lista_examenes, lista_usuarios, opciones, rng) \
+        if lista_examenes else []
+    return {
+        "usuarios": lista_usuarios,
+        "profesores": [{"id": p["id"], "name": p["name"], "lastName": p["lastName"]} for p in profesores],
+        "preguntas": lista_preguntas,
+        "opciones": opciones,
+        "examenes": lista_examenes,
+        "resultados": lista_resultados,
+    }
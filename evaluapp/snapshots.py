@@ -0,0 +1,142 @@
+"""Snapshots locales en formato columnar de las colecciones de la API.
+
+Cada colección se guarda como un archivo Parquet (o Feather) junto a un JSON
+de metadatos con la fecha de descarga, para poder repetir análisis sin volver
+a consultar el backend de Render. Ambos formatos requieren `pyarrow`.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+from evaluapp.tablas import tabla_resultados
+
+DIRECTORIO = os.environ.get(
+    "EVALUAPP_SNAPSHOTS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snapshots"),
+)
+FORMATOS = {"parquet": "parquet", "feather": "feather"}
+
+# Parámetro con el que se pide a la API solo los resultados posteriores al
+# último id guardado. Si el servidor lo ignora se descarga la lista completa
+# y los duplicados se descartan en el cliente.
+PARAM_DESDE_ID = "desdeId"
+
+
+class ErrorSnapshot(Exception):
+    pass
+
+
+class AlmacenSnapshots:
+    def __init__(self, directorio=DIRECTORIO, formato="parquet"):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de snapshot no soportado: {formato}")
+        self.directorio = directorio
+        self.formato = formato
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio, f"{nombre}.{FORMATOS[self.formato]}")
+
+    def ruta_metadatos(self, nombre):
+        return os.path.join(self.directorio, f"{nombre}.json")
+
+    def existe(self, nombre):
+        return os.path.exists(self.ruta(nombre)) and os.path.exists(self.ruta_metadatos(nombre))
+
+    def metadatos(self, nombre):
+        if not os.path.exists(self.ruta_metadatos(nombre)):
+            return None
+        with open(self.ruta_metadatos(nombre), encoding="utf-8") as f:
+            return json.load(f)
+
+    def guardar(self, nombre, df):
+        import pandas as pd  # Solo al leer o escribir snapshots
+        os.makedirs(self.directorio, exist_ok=True)
+        df = df.reset_index(drop=True)
+
+        # Las columnas con listas o diccionarios (p. ej. preguntasIds) se
+        # guardan como texto JSON para no depender de tipos anidados
+        columnas_json = [c for c in df.columns if df[c].dtype == object
+                         and df[c].map(lambda v: isinstance(v, (list, dict))).any()]
+        if columnas_json:
+            df = df.copy()
+            for columna in columnas_json:
+                df[columna] = df[columna].map(lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v)
+
+        # Escribir a un temporal y renombrar para no dejar snapshots a medias
+        ruta = self.ruta(nombre)
+        temporal = ruta + ".tmp"
+        if self.formato == "parquet":
+            df.to_parquet(temporal, index=False)
+        else:
+            df.to_feather(temporal)
+        os.replace(temporal, ruta)
+
+        metadatos = {
+            "coleccion": nombre,
+            "obtenido_en": datetime.now(timezone.utc).isoformat(),
+            "filas": len(df),
+            "formato": self.formato,
+            "columnas_json": columnas_json,
+        }
+        if "id" in df.columns and pd.api.types.is_numeric_dtype(df["id"]) and len(df):
+            metadatos["ultimo_id"] = int(df["id"].max())
+        with open(self.ruta_metadatos(nombre), "w", encoding="utf-8") as f:
+            json.dump(metadatos, f, ensure_ascii=False, indent=2)
+        return metadatos
+
+    def marcar_actualizado(self, nombre):
+        # El contenido sigue vigente: solo se renueva la fecha de descarga
+        metadatos = self.metadatos(nombre)
+        metadatos["obtenido_en"] = datetime.now(timezone.utc).isoformat()
+        with open(self.ruta_metadatos(nombre), "w", encoding="utf-8") as f:
+            json.dump(metadatos, f, ensure_ascii=False, indent=2)
+
+    def cargar(self, nombre, columnas=None):
+        # Con `columnas` solo se leen del archivo las que existan de esa lista
+        import pandas as pd
+        if not self.existe(nombre):
+            raise ErrorSnapshot(f"No existe snapshot de {nombre} en {self.directorio}")
+        metadatos = self.metadatos(nombre)
+        feather = metadatos.get("formato", "parquet") == "feather"
+        if columnas is not None:
+            existentes = set(self._columnas(nombre, feather))
+            columnas = [c for c in columnas if c in existentes]
+        if feather:
+            df = pd.read_feather(self.ruta(nombre), columns=columnas)
+        else:
+            df = pd.read_parquet(self.ruta(nombre), columns=columnas)
+        for columna in metadatos.get("columnas_json", []):
+            if columna not in df.columns:
+                continue
+            df[columna] = df[columna].map(lambda v: json.loads(v) if isinstance(v, str) else v)
+        return df
+
+    def _columnas(self, nombre, feather):
+        # Nombres de columna del archivo, leyendo solo su esquema
+        import pyarrow
+        if feather:
+            with pyarrow.memory_map(self.ruta(nombre)) as archivo:
+                return pyarrow.ipc.open_file(archivo).schema.names
+        import pyarrow.parquet
+        return pyarrow.parquet.read_schema(self.ruta(nombre)).names
+
+
+def refrescar_resultados(almacen, cliente, timeout=None):
+    # Añade al snapshot solo los resultados nuevos. Devuelve cuántos se agregaron.
+    import pandas as pd
+    existentes = almacen.cargar("resultados")
+    ultimo_id = (almacen.metadatos("resultados") or {}).get("ultimo_id")
+    params = {PARAM_DESDE_ID: ultimo_id} if ultimo_id is not None else None
+
+    response = cliente.get("resultados", params=params, timeout=timeout)
+    if response.status_code != 200:
+        raise ErrorSnapshot(f"Error {response.status_code} al obtener resultados: {response.text[:200]}")
+    nuevos = tabla_resultados(response.json() or [])
+    if "id" in nuevos.columns and "id" in existentes.columns:
+        nuevos = nuevos[~nuevos["id"].isin(existentes["id"])]
+    if nuevos.empty:
+        almacen.marcar_actualizado("resultados")
+        return 0
+
+    almacen.guardar("resultados", pd.concat([existentes, nuevos], ignore_index=True))
+    return len(nuevos)
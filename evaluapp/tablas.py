@@ -0,0 +1,131 @@
+"""Tablas tipadas y compactas para los análisis sobre muchos datos.
+
+En lugar de aplanar cada registro entero con `json_normalize` (y guardar
+texto repetido como objetos de Python) solo se leen las columnas que usa el
+análisis, y cada una se convierte a un tipo compacto:
+
+- ids: el entero más pequeño que los contiene (uint8 ... int64)
+- textos repetidos (rol, email, título del examen): categóricas, que guardan
+  cada valor distinto una vez y un código entero por fila
+- fechas: datetime64
+- números: float64, para que las sumas no cambien respecto a las de siempre
+
+Una tabla de resultados con estas columnas ocupa en torno a una décima parte
+que la misma tabla con columnas de tipo object.
+"""
+
+# tabla -> columna -> tipo. Las columnas con punto se leen de objetos
+# anidados: "usuario.email" es registro["usuario"]["email"].
+COLUMNAS = {
+    "usuarios": {"id": "id", "role": "categoria"},
+    "resultados": {
+        "id": "id",
+        "puntaje": "numero",
+        "fecha": "fecha",
+        "usuario.email": "categoria",
+        "examen.titulo": "categoria",
+    },
+}
+
+
+def tabla_resultados(registros):
+    # Resultados aplanados como con json_normalize, salvo las respuestas, que
+    # quedan tal cual en una sola columna: aplanar el mapa {pregunta: opción}
+    # crearía una columna por cada pregunta que aparece en todo el conjunto
+    import pandas as pd
+    respuestas = [r.get("respuestas") if isinstance(r, dict) else None for r in registros]
+    tabla = pd.json_normalize([{k: v for k, v in r.items() if k != "respuestas"} if isinstance(r, dict) else {}
+                               for r in registros], sep=".")
+    if any(v is not None for v in respuestas):
+        tabla["respuestas"] = pd.Series(respuestas, index=tabla.index, dtype=object)
+    return tabla
+
+
+def _valor(registro, ruta):
+    for clave in ruta:
+        if not isinstance(registro, dict):
+            return None
+        registro = registro.get(clave)
+    return registro
+
+
+def extraer(registros, columnas):
+    # Valores de las columnas pedidas, columna a columna, en una sola pasada
+    rutas = [(columna, columna.split(".")) for columna in columnas]
+    valores = {columna: [] for columna in columnas}
+    for registro in registros:
+        for columna, ruta in rutas:
+            valores[columna].append(_valor(registro, ruta))
+    return valores
+
+
+def convertir(serie, tipo):
+    import pandas as pd
+    if tipo == "id":
+        numeros = pd.to_numeric(serie, errors="coerce")
+        if numeros.isna().any():
+            return numeros.astype("Int64")  # Con huecos: entero con nulos
+        return pd.to_numeric(numeros.astype("int64"), downcast="unsigned" if (numeros >= 0).all() else "integer")
+    if tipo == "categoria":
+        return serie.astype("category")
+    if tipo == "fecha":
+        fechas = pd.to_datetime(serie, format="ISO8601", errors="coerce")
+        # Fechas con zonas horarias distintas no caben en una columna datetime64
+        return fechas if pd.api.types.is_datetime64_any_dtype(fechas) else serie
+    if tipo == "numero":
+        return pd.to_numeric(serie, errors="coerce").astype("float64")
+    raise ValueError(f"Tipo de columna desconocido: {tipo}")
+
+
+def tabla_tipada(registros, columnas):
+    # DataFrame con solo `columnas` ({columna: tipo}) a partir de registros JSON
+    import pandas as pd
+    valores = extraer(registros, columnas)
+    return pd.DataFrame({columna: convertir(pd.Series(valores[columna], dtype=object), tipo)
+                         for columna, tipo in columnas.items()})
+
+
+def tipar(df, columnas):
+    # La misma tabla compacta a partir de un DataFrame ya aplanado (p. ej. un
+    # snapshot); las columnas que falten quedan vacías
+    import pandas as pd
+    return pd.DataFrame({
+        columna: convertir(df[columna] if columna in df.columns
+                           else pd.Series([None] * len(df), index=df.index, dtype=object), tipo)
+        for columna, tipo in columnas.items()
+    }).reset_index(drop=True)
+
+
+def concatenar(tablas):
+    # Concatena tablas tipadas conservando las categóricas: pd.concat las
+    # convierte en object si cada tabla tiene categorías distintas
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+    tablas = [t for t in tablas if len(t.columns)]
+    if not tablas:
+        return pd.DataFrame()
+    resultado = pd.concat(tablas, ignore_index=True)
+    for columna in tablas[0].columns:
+        if isinstance(tablas[0][columna].dtype, pd.CategoricalDtype):
+            resultado[columna] = union_categoricals([t[columna] for t in tablas])
+    return resultado
+
+
+def uso_memoria(df):
+    # Bytes por columna, contando el contenido de los textos
+    return df.memory_usage(index=False, deep=True)
+
+
+def _tamano(n):
+    for unidad in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unidad}" if unidad == "B" else f"{n:.1f} {unidad}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def describir_memoria(df):
+    # "1.2 MiB (id 8.0 KiB uint16, role 1.1 KiB category)"
+    bytes_columna = uso_memoria(df)
+    detalle = ", ".join(f"{columna} {_tamano(n)} {df[columna].dtype}" for columna, n in bytes_columna.items())
+    return f"{_tamano(bytes_columna.sum())} ({detalle})"
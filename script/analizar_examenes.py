@@ -1,54 +1,59 @@
-import requests
-import pandas as pd
+import argparse
+import os
+import sys
 from datetime import datetime
-import matplotlib.pyplot as plt
-
-# Configuración
-API_URL = "https://evaluapp.onrender.com/api/examenes"
-
-# 1. Obtener datos
-response = requests.get(API_URL)
-print(f"Status code: {response.status_code}")
-print(f"Respuesta JSON cruda: {response.text}")
-if response.status_code != 200:
-    print(f"Error al obtener datos: {response.status_code}")
-    exit()
-
-examenes = response.json()
-
-# 2. Convertir a DataFrame
-df = pd.json_normalize(
-    examenes,
-    sep=".",
-    meta=[
-        "id", "titulo", "descripcion", "fechaInicio", "fechaFin",
-        "creadorId",
-        "creadorNombre"
-    ]
-)
-
-# 3. Parsear fechas y calcular duración
-df["fechaInicio"] = pd.to_datetime(df["fechaInicio"], errors='coerce')
-df["fechaFin"] = pd.to_datetime(df["fechaFin"], errors='coerce')
-df["duracion_min"] = (df["fechaFin"] - df["fechaInicio"]).dt.total_seconds() / 60
-
-# 4. Análisis básico
-print("Resumen de exámenes:")
-print(df[["titulo", "fechaInicio", "fechaFin", "duracion_min"]])
-
-# 5. Exámenes por creador
-if df["creadorNombre"].notna().any():
-    conteo_creadores = df["creadorNombre"].value_counts()
-    print("\nExámenes por creador:")
-    print(conteo_creadores)
-else:
-    print("\nNo hay información de creadores disponible")
-
-# 6. Gráfico de duración
-plt.figure(figsize=(10, 6))
-plt.barh(df["titulo"], df["duracion_min"])
-plt.title("Duración de Exámenes (min)")
-plt.xlabel("Duración (minutos)")
-plt.ylabel("Examen")
-plt.tight_layout()
-plt.show()
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.figuras import agregar_argumentos_figuras, figuras_desde_argumentos
+
+
+def analizar(fuente, figuras):
+    # 1. Obtener datos y convertir a DataFrame (copia: la tabla es compartida)
+    df = fuente.examenes().copy()
+    import pandas as pd  # Solo una vez descargados los datos
+
+    # 2. Parsear fechas y calcular duración
+    df["fechaInicio"] = pd.to_datetime(df["fechaInicio"], errors='coerce')
+    df["fechaFin"] = pd.to_datetime(df["fechaFin"], errors='coerce')
+    df["duracion_min"] = (df["fechaFin"] - df["fechaInicio"]).dt.total_seconds() / 60
+
+    # 3. Análisis básico
+    print("Resumen de exámenes:")
+    print(df[["titulo", "fechaInicio", "fechaFin", "duracion_min"]])
+
+    # 4. Exámenes por creador
+    if "creadorNombre" in df.columns and df["creadorNombre"].notna().any():
+        conteo_creadores = df["creadorNombre"].value_counts()
+        print("\nExámenes por creador:")
+        print(conteo_creadores)
+    else:
+        print("\nNo hay información de creadores disponible")
+
+    # 5. Gráfico de duración
+    fig, ax = figuras.nueva(figsize=(10, 6))
+    ax.barh(df["titulo"], df["duracion_min"])
+    ax.set_title("Duración de Exámenes (min)")
+    ax.set_xlabel("Duración (minutos)")
+    ax.set_ylabel("Examen")
+    figuras.guardar(fig, "duracion_examenes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de exámenes")
+    agregar_argumentos_figuras(parser)
+    args = parser.parse_args()
+    figuras = figuras_desde_argumentos(args)
+
+    try:
+        analizar(FuenteDatos(), figuras)
+    except ErrorDatos as e:
+        print(f"Error al obtener datos: {e}")
+        sys.exit(1)
+    figuras.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,85 @@
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt 
-
-#Primer paso: obtener todas las reguntas para dar las opciones
-
-PREGUNTAS_URL = "https://evaluapp.onrender.com/api/preguntas"
-OPCIONES_BASE_URL = "https://evaluapp.onrender.com/api/opciones/pregunta"
-
-resp_preg = requests.get(PREGUNTAS_URL)
-if resp_preg.status_code != 200:
-    print("Error al obtener lapregunta")
-    exit()
-
-preguntas = resp_preg.json()
-
-# Recorrer cada pregunta y pedir sus opciones
-todas_opciones= []
-
-for pregunta in preguntas:
-    pregunta_id = pregunta["id"]
-    texto = pregunta.get("testoPregunta", "sin texto")
-
-    resp_opt = requests.get(f"{OPCIONES_BASE_URL}/{pregunta_id}")
-    if resp_opt.status_code != 200:
-        print(f"Error con la pregunta {pregunta_id}")
-        continue
-    opciones = resp_opt.json()
-    for opcion in opciones:
-        opcion["pregunta_id"]= pregunta_id
-        opcion["texto_pregunta"] = texto
-        todas_opciones.append(opcion)
-
-# Tercero: Convertir la data en la DataFrame
-
-df= pd.json_normalize(todas_opciones, sep=".")
-
-print("\nOpciones recibidas:")
-print(df[["id", "textoOpcion", "esCorrecta", "pregunta_id", "texto_pregunta"]].head())
-
-#CuartoAnálisis por pregunta
-
-conteo_opciones = df["pregunta_id"].value_counts()
-correctas_por_pregunta = df[df["esCorrecta"] == True]["pregunta_id"].value_counts()
-
-#Quinto: Validar preguntas mal configuradas
-preguntas_con_problemas = correctas_por_pregunta[(correctas_por_pregunta > 1) | (correctas_por_pregunta == 0)]
-print("\n Preguntas con 0 o más de una opción correcta:")
-print(preguntas_con_problemas)
-
-#Sexto: gráfico de la cantidad de opciones por pregunta
-
-conteo_opciones.plot(kind= "bar", title = "Cantidad de opciones por pregunta", ylabel= "Opciones", xlabel= "ID pregunta", color="red")
-plt.tight_layout()
-plt.show()
-
+import argparse
+import os
+import sys
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluapp.cliente import MAX_CONCURRENCIA
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.figuras import agregar_argumentos_figuras, figuras_desde_argumentos
+from evaluapp.paralelo import PROCESOS, configurar_procesos, mapear_particiones, ordenar_conteos
+
+
+def agregar_argumentos(parser):
+    parser.add_argument("--concurrencia", type=int, default=MAX_CONCURRENCIA,
+                        help="peticiones de opciones simultáneas (1 = secuencial)")
+    parser.add_argument("--timeout", type=float, default=30,
+                        help="segundos máximos de espera por petición")
+    parser.add_argument("--procesos", type=int, default=PROCESOS,
+                        help="procesos para los cálculos sobre tablas grandes (1 = en serie)")
+
+
+def contar_por_pregunta(opciones):
+    # Opciones y opciones correctas de cada pregunta, incluidas las que no
+    # tienen ninguna correcta. Se aplica a cada partición por pregunta_id.
+    import pandas as pd
+    por_pregunta = opciones["pregunta_id"]
+    return pd.DataFrame({
+        "opciones": opciones.groupby(por_pregunta).size(),
+        "correctas": (opciones["esCorrecta"] == True).groupby(por_pregunta).sum(),
+    })
+
+
+def analizar(fuente, figuras):
+    #Primero y segundo: obtener todas las preguntas y sus opciones (en paralelo)
+    df = fuente.opciones()
+
+    # Informar de las preguntas que no se pudieron consultar sin abortar el análisis
+    if fuente.fallos_opciones:
+        print(f"\nNo se pudieron obtener las opciones de {len(fuente.fallos_opciones)} de {len(fuente.crudo('preguntas'))} preguntas:")
+        for pregunta_id, motivo in fuente.fallos_opciones:
+            print(f"- Pregunta {pregunta_id}: {motivo}")
+
+    # Tercero: mostrar la data ya convertida en DataFrame
+    print("\nOpciones recibidas:")
+    print(df[["id", "textoOpcion", "esCorrecta", "pregunta_id", "texto_pregunta"]].head())
+
+    #CuartoAnálisis por pregunta
+
+    # Cada pregunta cae entera en una partición, así que los parciales solo se juntan
+    import pandas as pd
+    por_pregunta = pd.concat(mapear_particiones(df, "pregunta_id", contar_por_pregunta)).sort_index()
+    conteo_opciones = ordenar_conteos(por_pregunta["opciones"])
+    correctas_por_pregunta = por_pregunta["correctas"]
+
+    #Quinto: Validar preguntas mal configuradas
+    preguntas_con_problemas = correctas_por_pregunta[(correctas_por_pregunta > 1) | (correctas_por_pregunta == 0)]
+    print("\n Preguntas con 0 o más de una opción correcta:")
+    print(preguntas_con_problemas)
+
+    #Sexto: gráfico de la cantidad de opciones por pregunta
+
+    fig, ax = figuras.nueva()
+    conteo_opciones.plot(kind= "bar", ax=ax, title = "Cantidad de opciones por pregunta", ylabel= "Opciones", xlabel= "ID pregunta", color="red")
+    figuras.guardar(fig, "opciones_por_pregunta")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auditoría de opciones por pregunta")
+    agregar_argumentos(parser)
+    agregar_argumentos_figuras(parser)
+    args = parser.parse_args()
+    figuras = figuras_desde_argumentos(args)
+    configurar_procesos(args.procesos)
+
+    try:
+        analizar(FuenteDatos(concurrencia=args.concurrencia, timeout=args.timeout), figuras)
+    except ErrorDatos:
+        print("Error al obtener lapregunta")
+        sys.exit(1)
+    figuras.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,53 @@
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
-
-API_URL = "https://evaluapp.onrender.com/api/preguntas"
-response = requests.get(API_URL)
-
-if response.status_code != 200:
-    print("Error al obtener preguntas")
-    exit()
-
-preguntas = response.json()
-df = pd.json_normalize(preguntas, sep=".")
-
-# Ver columnas disponibles (opcional)
-print("\nColumnas reales del DataFrame:")
-print(df.columns)
-
-# Mostrar preguntas disponibles
-print("\nPreguntas disponibles:")
-if "examen.titulo" in df.columns:
-    print(df[["id", "textoPregunta", "examen.titulo"]].head())
-else:
-    print(df[["id", "textoPregunta", "tipoPregunta"]].head())
-    print("\nNota: La información del examen no está disponible en los datos")
-
-# Conteo por tipo de pregunta
-conteo = df["tipoPregunta"].value_counts()
-print("\nNúmero de preguntas por examen:")
-print(conteo)
-
-# Gráfico
-conteo.plot(kind="bar", title="Preguntas por examen", ylabel="Cantidad", xlabel="Examen", color="lightblue")
-plt.tight_layout()
-plt.show()
+import argparse
+import os
+import sys
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.figuras import agregar_argumentos_figuras, figuras_desde_argumentos
+
+
+def analizar(fuente, figuras):
+    df = fuente.preguntas()
+
+    # Ver columnas disponibles (opcional)
+    print("\nColumnas reales del DataFrame:")
+    print(df.columns)
+
+    # Mostrar preguntas disponibles
+    print("\nPreguntas disponibles:")
+    if "examen.titulo" in df.columns:
+        print(df[["id", "textoPregunta", "examen.titulo"]].head())
+    else:
+        print(df[["id", "textoPregunta", "tipoPregunta"]].head())
+        print("\nNota: La información del examen no está disponible en los datos")
+
+    # Conteo por tipo de pregunta
+    conteo = df["tipoPregunta"].value_counts()
+    print("\nNúmero de preguntas por examen:")
+    print(conteo)
+
+    # Gráfico
+    fig, ax = figuras.nueva()
+    conteo.plot(kind="bar", ax=ax, title="Preguntas por examen", ylabel="Cantidad", xlabel="Examen", color="lightblue")
+    figuras.guardar(fig, "preguntas_por_tipo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de preguntas")
+    agregar_argumentos_figuras(parser)
+    args = parser.parse_args()
+    figuras = figuras_desde_argumentos(args)
+
+    try:
+        analizar(FuenteDatos(), figuras)
+    except ErrorDatos:
+        print("Error al obtener preguntas")
+        sys.exit(1)
+    figuras.finalizar()
+
+
+if __name__ == "__main__":
+    main()
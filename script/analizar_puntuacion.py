@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analizar_opciones import agregar_argumentos
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.figuras import agregar_argumentos_figuras, figuras_desde_argumentos
+from evaluapp.paralelo import configurar_procesos
+
+# Por debajo de este índice una pregunta apenas distingue a los mejores alumnos
+DISCRIMINACION_MINIMA = 0.2
+
+
+def analizar(fuente, figuras):
+    # Recalcular puntajes a partir de las respuestas y las opciones correctas
+    resultados, opciones = fuente.resultados(), fuente.opciones()
+    # pandas y NumPy se cargan solo una vez descargados los datos
+    import pandas as pd
+    from evaluapp.puntuacion import calcular
+    puntuacion = calcular(resultados, opciones)
+    intentos = puntuacion.intentos
+    preguntas = puntuacion.preguntas
+
+    print("\nPuntaje recalculado por intento:")
+    print(intentos["puntaje"].describe().round(2))
+
+    if "puntaje_servidor" in intentos.columns:
+        diferencia = (intentos["puntaje"] - pd.to_numeric(intentos["puntaje_servidor"], errors="coerce")).abs()
+        print(f"\nIntentos cuyo puntaje difiere del informado por el servidor: {(diferencia > 0.01).sum()}")
+
+    print("\nPreguntas más difíciles (menor proporción de aciertos):")
+    print(preguntas.sort_values("dificultad").head(10).round(3))
+
+    print("\nPreguntas más fáciles:")
+    print(preguntas.sort_values("dificultad", ascending=False).head(10).round(3))
+
+    poco_discriminantes = preguntas[preguntas["discriminacion"] < DISCRIMINACION_MINIMA]
+    print(f"\nPreguntas con discriminación menor a {DISCRIMINACION_MINIMA}:")
+    print(poco_discriminantes.sort_values("discriminacion").round(3))
+
+    print("\nDistribución de puntajes:")
+    print(puntuacion.distribucion)
+
+    # Gráfico: distribución de puntajes
+    fig, ax = figuras.nueva()
+    puntuacion.distribucion.plot(kind="bar", ax=ax, title="Distribución de puntajes", ylabel="Intentos", xlabel="Puntaje", color="seagreen")
+    figuras.guardar(fig, "distribucion_puntajes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Puntuación y análisis de ítems")
+    agregar_argumentos(parser)
+    agregar_argumentos_figuras(parser)
+    args = parser.parse_args()
+    figuras = figuras_desde_argumentos(args)
+    configurar_procesos(args.procesos)
+
+    try:
+        analizar(FuenteDatos(concurrencia=args.concurrencia, timeout=args.timeout), figuras)
+    except ErrorDatos as e:
+        print(f"Error al obtener datos: {e}")
+        sys.exit(1)
+    figuras.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,98 @@
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
-
-API_URL = "https://evaluapp.onrender.com/api/resultados"
-response = requests.get(API_URL)
-
-if response.status_code != 200:
-    print(f"Error al obtener resultados: {response.status_code}")
-    print(f"Mensaje de error: {response.text}")
-    exit()
-
-resultados = response.json()
-print("\nDatos recibidos de la API:")
-print(resultados)
-
-# Convertir JSON a DataFrame
-df = pd.json_normalize(
-    resultados,
-    sep="."
-)
-print("\nColumnas disponibles:")
-print(df.columns)
-
-
-# Parsear fecha
-# df["fecha"] = pd.to_datetime(df["fecha"])
-
-# Mostrar resultados crudos
-print("\nResultados cargados:")
-print(df[["usuario.email", "examen.titulo", "puntaje", "fecha"]].head())
-
-# Promedio por examen
-promedio_examen = df.groupby("examen.titulo")["puntaje"].mean()
-print("\nPromedio por examen:")
-print(promedio_examen.round(2))
-
-# Promedio por usuario
-promedio_usuario = df.groupby("usuario.email")["puntaje"].mean()
-print("\nPromedio por usuario:")
-print(promedio_usuario.round(2))
-
-# Usuario con mejor y peor promedio
-mejor = promedio_usuario.idxmax()
-peor = promedio_usuario.idxmin()
-print(f"\n📈 Mejor promedio: {mejor} con {promedio_usuario[mejor]:.2f}")
-print(f"📉 Peor promedio: {peor} con {promedio_usuario[peor]:.2f}")
-
-# Gráfico: promedio por examen
-promedio_examen.plot(kind="bar", title="Promedio de puntaje por examen", color="skyblue")
-plt.ylabel("Puntaje")
-plt.xlabel("Examen")
-plt.tight_layout()
-plt.show()
+import argparse
+import os
+import sys
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluapp.agregados import AGRUPACIONES, RUTA, AgregadosResultados, ruta_origen
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.figuras import agregar_argumentos_figuras, figuras_desde_argumentos
+from evaluapp.tablas import describir_memoria, uso_memoria
+
+
+def analizar(fuente, figuras, ruta_agregados=RUTA, completo=False):
+    # Los resultados se recorren por lotes y solo se guardan sumas, conteos e
+    # histogramas por examen y por usuario. Esos agregados se conservan entre
+    # ejecuciones (uno por fuente de datos), así que normalmente solo se
+    # procesan los resultados nuevos.
+    ruta_agregados = ruta_origen(ruta_agregados, fuente.origen)
+    agregados = AgregadosResultados(fuente.origen) if completo \
+        else AgregadosResultados.cargar(ruta_agregados, fuente.origen)
+    desde_id = agregados.ultimo_id
+    if desde_id is not None:
+        print(f"\nAgregados guardados hasta el resultado {desde_id} "
+              f"({agregados.procesados} resultados); se procesan solo los nuevos")
+
+    # Cada lote trae solo las columnas del análisis, con tipos compactos
+    nuevos = 0
+    memoria_lote = 0
+    for lote in fuente.resultados_por_lotes(desde_id=desde_id, tipados=True):
+        if nuevos == 0 and not lote.empty:
+            print("\nResultados cargados:")
+            print(lote[["usuario.email", "examen.titulo", "puntaje", "fecha"]].head())
+            print(f"\nMemoria del primer lote ({len(lote)} filas): {describir_memoria(lote)}")
+        memoria_lote = max(memoria_lote, int(uso_memoria(lote).sum()))
+        nuevos += agregados.agregar_lote(lote, desde_id)
+
+    if not agregados.procesados:
+        print("\nNo hay resultados para analizar")
+        return
+    if nuevos:
+        agregados.guardar(ruta_agregados)
+    print(f"\nResultados procesados: {agregados.procesados} ({nuevos} nuevos)")
+    if memoria_lote:
+        print(f"Memoria máxima por lote: {memoria_lote / 1024:.1f} KiB")
+
+    import pandas as pd
+
+    # Promedio por examen
+    promedio_examen = pd.Series(agregados.medias("examen"), name="puntaje").rename_axis(AGRUPACIONES["examen"]).sort_index()
+    print("\nPromedio por examen:")
+    print(promedio_examen.round(2))
+
+    # Mediana y p90 por examen, a partir de los histogramas
+    cuantiles = pd.DataFrame.from_dict(
+        {titulo: {"n": e.n, "mediana": e.cuantil(0.5), "p90": e.cuantil(0.9)}
+         for titulo, e in agregados.grupos["examen"].items()}, orient="index").sort_index()
+    print("\nMediana y p90 por examen:")
+    print(cuantiles)
+
+    # Promedio por usuario
+    promedio_usuario = pd.Series(agregados.medias("usuario"), name="puntaje").rename_axis(AGRUPACIONES["usuario"]).sort_index()
+    print("\nPromedio por usuario:")
+    print(promedio_usuario.round(2))
+
+    # Usuario con mejor y peor promedio
+    mejor = promedio_usuario.idxmax()
+    peor = promedio_usuario.idxmin()
+    print(f"\n📈 Mejor promedio: {mejor} con {promedio_usuario[mejor]:.2f}")
+    print(f"📉 Peor promedio: {peor} con {promedio_usuario[peor]:.2f}")
+
+    # Gráfico: promedio por examen
+    fig, ax = figuras.nueva()
+    promedio_examen.plot(kind="bar", ax=ax, title="Promedio de puntaje por examen", color="skyblue")
+    ax.set_ylabel("Puntaje")
+    ax.set_xlabel("Examen")
+    figuras.guardar(fig, "promedio_por_examen")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de resultados")
+    parser.add_argument("--completo", action="store_true",
+                        help="Recalcular los agregados con todos los resultados en vez de solo los nuevos")
+    parser.add_argument("--agregados", default=RUTA, help="Ruta base de los agregados guardados (se añade la fuente de datos al nombre)")
+    agregar_argumentos_figuras(parser)
+    args = parser.parse_args()
+    figuras = figuras_desde_argumentos(args)
+
+    try:
+        analizar(FuenteDatos(), figuras, args.agregados, args.completo)
+    except ErrorDatos as e:
+        print(f"Error al obtener resultados: {e}")
+        sys.exit(1)
+    figuras.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,55 @@
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
-
-API_URL = "https://evaluapp.onrender.com/api/admin/users"
-response = requests.get(API_URL)
-
-if response.status_code != 200:
-    print("Error al obtener usuarios")
-    exit()
-
-usuarios = response.json()
-df = pd.DataFrame(usuarios)
-
-# Conteo por rol
-conteo_roles = df["role"].value_counts()
-porcentaje_roles = df["role"].value_counts(normalize=True) * 100
-
-# Mostrar resultados en consola
-print("\nUsuarios por rol:")
-print(conteo_roles)
-print("\nPorcentaje por rol:")
-print(porcentaje_roles.round(2))
-
-# Gráfico de barras
-conteo_roles.plot(kind="bar", title="Cantidad de usuarios por rol", ylabel="Usuarios", xlabel="Rol", color='skyblue')
-plt.tight_layout()
-plt.show()
-
-# Gráfico de torta
-porcentaje_roles.plot(kind="pie", autopct='%1.1f%%', startangle=90, title="Distribución de roles")
-plt.ylabel("")  # Quitar etiqueta del eje Y
-plt.tight_layout()
-plt.show()
+import argparse
+import os
+import sys
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.figuras import agregar_argumentos_figuras, figuras_desde_argumentos
+from evaluapp.tablas import describir_memoria
+
+
+def analizar(fuente, figuras):
+    # Solo id y rol, con el rol como categórica
+    df = fuente.usuarios_tipados()
+    print(f"\nUsuarios cargados: {len(df)}, memoria {describir_memoria(df)}")
+
+    # Conteo por rol (sin los roles que no tiene ningún usuario)
+    conteo_roles = df["role"].value_counts().loc[lambda s: s > 0]
+    porcentaje_roles = (conteo_roles / conteo_roles.sum()).rename("proportion") * 100
+
+    # Mostrar resultados en consola
+    print("\nUsuarios por rol:")
+    print(conteo_roles)
+    print("\nPorcentaje por rol:")
+    print(porcentaje_roles.round(2))
+
+    # Gráfico de barras
+    fig, ax = figuras.nueva()
+    conteo_roles.plot(kind="bar", ax=ax, title="Cantidad de usuarios por rol", ylabel="Usuarios", xlabel="Rol", color='skyblue')
+    figuras.guardar(fig, "usuarios_por_rol")
+
+    # Gráfico de torta
+    fig, ax = figuras.nueva()
+    porcentaje_roles.plot(kind="pie", ax=ax, autopct='%1.1f%%', startangle=90, title="Distribución de roles")
+    ax.set_ylabel("")  # Quitar etiqueta del eje Y
+    figuras.guardar(fig, "distribucion_roles")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de usuarios")
+    agregar_argumentos_figuras(parser)
+    args = parser.parse_args()
+    figuras = figuras_desde_argumentos(args)
+
+    try:
+        analizar(FuenteDatos(), figuras)
+    except ErrorDatos:
+        print("Error al obtener usuarios")
+        sys.exit(1)
+    figuras.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Prueba de carga: N estudiantes virtuales realizando exámenes a la vez.
+
+Es el simulador de realizar_examen.py con otros valores por defecto: sin
+--api-url levanta el servidor local de pruebas con datos sintéticos en este
+mismo proceso, así que nunca toca producción por accidente:
+
+    python script/prueba_carga.py --estudiantes 200 --concurrencia 40
+    python script/prueba_carga.py --api-url http://127.0.0.1:8000/api --estudiantes 50 --pensar 1
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from realizar_examen import main
+
+
+if __name__ == "__main__":
+    sys.exit(main(local_por_defecto=True, estudiantes=40))
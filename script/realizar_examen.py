@@ -1,103 +1,66 @@
-import requests
-import json
-from datetime import datetime
+"""Simulador de estudiantes realizando exámenes contra la API.
 
-# Configuración
-API_URL = "https://evaluapp.onrender.com/api"
+Por defecto un solo estudiante contra la API de EVALUAPP_API_URL. Para medir
+capacidad se lanzan muchos estudiantes a la vez, con la API real o con el
+servidor local de pruebas (--local) levantado en este mismo proceso:
 
-# 1. Obtener exámenes disponibles
-print("\nObteniendo exámenes disponibles...")
-examenes_response = requests.get(f"{API_URL}/examenes")
+    python script/realizar_examen.py
+    python script/realizar_examen.py --api-url http://127.0.0.1:8000/api --estudiantes 500 \\
+        --concurrencia 100 --pensar 2 --rampa 60 --salida-json carga.json
+    python script/realizar_examen.py --local --estudiantes 200 --latencia-ms 50
+"""
+import argparse
+import os
+import sys
 
-if examenes_response.status_code != 200:
-    print(f"Error al obtener exámenes: {examenes_response.status_code}")
-    print(f"Mensaje de error: {examenes_response.text}")
-    exit()
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-try:
-    examenes = examenes_response.json()
-    print(f"\nExámenes encontrados:")
-    for i, examen in enumerate(examenes, 1):
-        print(f"{i}. {examen['titulo']} (ID: {examen['id']})")
-    
-    # Si hay exámenes, seleccionamos el primero
-    if examenes:
-        examen_seleccionado = examenes[0]
-        print(f"\nSeleccionando examen: {examen_seleccionado['titulo']}")
-        
-        # 2. Obtener preguntas del examen seleccionado
-        print(f"\nObteniendo preguntas para el examen...")
-        preguntas_response = requests.get(f"{API_URL}/examenes/{examen_seleccionado['id']}/preguntas")
-        
-        if preguntas_response.status_code != 200:
-            print(f"Error al obtener preguntas: {preguntas_response.status_code}")
-            print(f"Mensaje de error: {preguntas_response.text}")
-            exit()
-        
-        try:
-            preguntas = preguntas_response.json()
-            print(f"\nPreguntas encontradas:")
-            for i, pregunta in enumerate(preguntas, 1):
-                print(f"{i}. {pregunta['pregunta']}")
-            
-            # 3. Simular respuestas
-            print("\nSimulando respuestas...")
-            resultados = []
-            for pregunta in preguntas:
-                # Tomamos la primera opción como respuesta (simulación)
-                opcion_id = pregunta['opciones'][0]['id']
-                resultados.append({
-                    "pregunta_id": pregunta['id'],
-                    "opcion_id": opcion_id
-                })
-            
-            # 4. Enviar resultados
-            print("\nEnviando resultados...")
-            resultado_data = {
-                "examen_id": examen_seleccionado['id'],
-                "usuario_id": 1,  # Por ahora usamos un usuario con ID 1
-                "resultados": resultados
-            }
-            
-            response = requests.post(f"{API_URL}/resultados", json=resultado_data)
-            
-            if response.status_code == 201:
-                print("\nExamen realizado exitosamente!")
-                print("Los resultados se han guardado en la base de datos.")
-            else:
-                print(f"Error al guardar resultados: {response.status_code}")
-                print(f"Mensaje de error: {response.text}")
-        except json.JSONDecodeError as e:
-            print(f"Error al decodificar JSON: {str(e)}")
-            print(f"Respuesta completa: {preguntas_response.text}")
-            exit()
-    else:
-        print("No hay exámenes disponibles")
-except json.JSONDecodeError as e:
-    print(f"Error al decodificar JSON de exámenes: {str(e)}")
-    print(f"Respuesta completa: {examenes_response.text}")
-    exit()
-    print(f"- {pregunta['pregunta']}")
-    # Tomamos la primera opción como respuesta (simulación)
-    opcion_id = pregunta['opciones'][0]['id']
-    resultados.append({
-        "pregunta_id": pregunta['id'],
-        "opcion_id": opcion_id
-    })
+from evaluapp.cliente import API_BASE_URL, ClienteAPI
+from evaluapp.servidor_local import (agregar_argumentos_escala, escala_desde_argumentos,
+                                     iniciar_en_segundo_plano, url_base)
+from evaluapp.simulador import agregar_argumentos_simulacion, comportamiento_desde_argumentos, ejecutar_carga
 
-# 3. Enviar resultados
-print("\nEnviando resultados...")
-resultado_data = {
-    "examen_id": examen_id,
-    "usuario_id": 1,  # Por ahora usamos un usuario con ID 1
-    "resultados": resultados
-}
 
-response = requests.post(f"{API_URL}/resultados", json=resultado_data)
+def main(local_por_defecto=False, estudiantes=1):
+    parser = argparse.ArgumentParser(description="Simulador de estudiantes de Evaluapp")
+    parser.add_argument("--api-url", default=None,
+                        help="API a probar (por defecto, " +
+                             ("un servidor local sintético)" if local_por_defecto else "EVALUAPP_API_URL)"))
+    parser.add_argument("--local", action="store_true", default=local_por_defecto,
+                        help="levantar el servidor local de pruebas con datos sintéticos")
+    agregar_argumentos_simulacion(parser)
+    agregar_argumentos_escala(parser)
+    parser.set_defaults(estudiantes=estudiantes)
+    args = parser.parse_args()
+    if args.concurrencia is None:
+        # Por defecto, todos los estudiantes a la vez
+        args.concurrencia = args.estudiantes
 
-if response.status_code == 201:
-    print("\nExamen realizado exitosamente!")
-    print("Los resultados se han guardado en la base de datos.")
-else:
-    print(f"Error al guardar resultados: {response.status_code}")
-    print(f"Mensaje de error: {response.text}")
+    servidor = None
+    api_url = args.api_url or API_BASE_URL
+    if args.local and args.api_url is None:
+        servidor = iniciar_en_segundo_plano(latencia=args.latencia_ms / 1000, **escala_desde_argumentos(args))
+        api_url = url_base(servidor)
+        print(f"Servidor local de pruebas en {api_url}")
+    print(f"Simulando {args.estudiantes} estudiantes ({args.concurrencia} a la vez) contra {api_url}")
+
+    # Un pool de conexiones por estudiante simultáneo
+    cliente = ClienteAPI(api_url, tamano_pool=max(args.concurrencia, 1))
+    try:
+        informe = ejecutar_carga(cliente, args.estudiantes, args.concurrencia, args.examen_id,
+                                 comportamiento_desde_argumentos(args, semilla=args.semilla))
+        informe.imprimir()
+        if args.salida_json:
+            informe.guardar(args.salida_json)
+            print(f"\nResumen guardado en {args.salida_json}")
+    finally:
+        cliente.cerrar()
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+    return 0 if informe.fallidos == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
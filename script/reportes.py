@@ -0,0 +1,87 @@
+"""Punto de entrada único para los análisis de Evaluapp.
+
+Ejemplos:
+    python script/reportes.py todos
+    python script/reportes.py resultados usuarios
+    python script/reportes.py opciones --concurrencia 16
+    python script/reportes.py todos --desde-snapshot
+    python script/reportes.py todos --salida informes/ --formato png svg
+
+Todos los análisis de una ejecución comparten la misma FuenteDatos, de modo
+que cada colección se descarga como mucho una vez.
+"""
+import argparse
+import importlib
+import os
+import sys
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analizar_opciones
+from evaluapp.cliente import configurar_cliente
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.figuras import agregar_argumentos_figuras, figuras_desde_argumentos
+from evaluapp.paralelo import configurar_procesos
+
+# Módulo de cada reporte; solo se importan los que se piden
+REPORTES = {
+    "examenes": "analizar_examenes",
+    "preguntas": "analizar_preguntas",
+    "opciones": "analizar_opciones",
+    "resultados": "analizar_resultados",
+    "puntuacion": "analizar_puntuacion",
+    "usuarios": "analizar_usuarios",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reportes de Evaluapp")
+    parser.add_argument("reportes", nargs="+", choices=list(REPORTES) + ["todos"],
+                        help="reportes a generar ('todos' para ejecutarlos todos)")
+    parser.add_argument("--api-url", default=None,
+                        help="URL base de la API (por defecto EVALUAPP_API_URL o producción)")
+    parser.add_argument("--desde-snapshot", action="store_true",
+                        help="leer los datos de los snapshots locales en vez de la API")
+    analizar_opciones.agregar_argumentos(parser)
+    agregar_argumentos_figuras(parser)
+    args = parser.parse_args()
+    figuras = figuras_desde_argumentos(args)
+    configurar_procesos(args.procesos)
+
+    if args.api_url:
+        configurar_cliente(args.api_url)
+
+    nombres = list(REPORTES) if "todos" in args.reportes else list(dict.fromkeys(args.reportes))
+    fuente = FuenteDatos(concurrencia=args.concurrencia, timeout=args.timeout,
+                         desde_snapshot=args.desde_snapshot)
+
+    # La puntuación necesita la tabla completa de resultados; si se va a
+    # generar, se carga antes para que el resto de reportes la reutilice en
+    # lugar de volver a descargarla por lotes
+    if "puntuacion" in nombres:
+        try:
+            fuente.resultados()
+        except ErrorDatos:
+            pass  # El error se informará en el propio reporte
+
+    fallidos = []
+    for nombre in nombres:
+        print(f"\n===== Reporte: {nombre} =====")
+        try:
+            importlib.import_module(REPORTES[nombre]).analizar(fuente, figuras)
+        except ErrorDatos as e:
+            # Un reporte sin datos no impide generar los demás
+            print(f"Error al obtener datos: {e}")
+            fallidos.append(nombre)
+
+    figuras.finalizar()
+    if figuras.headless:
+        print(f"\nGráficos guardados: {len(figuras.archivos)} archivos en {figuras.directorio}")
+    if fallidos:
+        print(f"\nReportes con errores: {', '.join(fallidos)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
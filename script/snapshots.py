@@ -0,0 +1,79 @@
+"""Gestión de los snapshots locales usados por los reportes.
+
+Ejemplos:
+    python script/snapshots.py actualizar              # todas las colecciones
+    python script/snapshots.py actualizar resultados   # solo resultados nuevos
+    python script/snapshots.py actualizar resultados --completo
+    python script/snapshots.py estado
+"""
+import argparse
+import os
+import sys
+
+# Permitir importar el paquete compartido desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluapp.cliente import MAX_CONCURRENCIA
+from evaluapp.datos import ErrorDatos, FuenteDatos
+from evaluapp.snapshots import AlmacenSnapshots, ErrorSnapshot, FORMATOS, refrescar_resultados
+
+COLECCIONES = ["examenes", "preguntas", "opciones", "resultados", "usuarios"]
+
+
+def actualizar(args, almacen):
+    fuente = FuenteDatos(concurrencia=args.concurrencia, timeout=args.timeout, almacen=almacen)
+    for nombre in args.colecciones:
+        try:
+            # Los resultados solo crecen: basta con traer los nuevos
+            if nombre == "resultados" and not args.completo and almacen.existe("resultados"):
+                nuevos = refrescar_resultados(almacen, fuente.cliente, timeout=args.timeout)
+                print(f"resultados: {nuevos} resultados nuevos")
+            else:
+                metadatos = fuente.guardar_snapshots([nombre])[nombre]
+                print(f"{nombre}: {metadatos['filas']} filas guardadas")
+        except (ErrorDatos, ErrorSnapshot) as e:
+            print(f"{nombre}: error al actualizar ({e})")
+
+
+def estado(args, almacen):
+    for nombre in COLECCIONES:
+        metadatos = almacen.metadatos(nombre)
+        if metadatos:
+            print(f"{nombre}: {metadatos['filas']} filas, obtenido en {metadatos['obtenido_en']}")
+        else:
+            print(f"{nombre}: sin snapshot")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshots locales de Evaluapp")
+    parser.add_argument("--directorio", default=None, help="carpeta de los snapshots")
+    parser.add_argument("--formato", choices=list(FORMATOS), default="parquet")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p_actualizar = subparsers.add_parser("actualizar", help="descargar colecciones a disco")
+    # Sin choices: argparse compara la lista vacía por defecto con ellas y la rechaza
+    p_actualizar.add_argument("colecciones", nargs="*", metavar="coleccion",
+                              help=f"colecciones a actualizar (por defecto todas: {', '.join(COLECCIONES)})")
+    p_actualizar.add_argument("--completo", action="store_true",
+                              help="volver a descargar todos los resultados")
+    p_actualizar.add_argument("--concurrencia", type=int, default=MAX_CONCURRENCIA)
+    p_actualizar.add_argument("--timeout", type=float, default=30)
+    p_actualizar.set_defaults(funcion=actualizar)
+
+    p_estado = subparsers.add_parser("estado", help="mostrar los snapshots disponibles")
+    p_estado.set_defaults(funcion=estado)
+
+    args = parser.parse_args()
+    if args.comando == "actualizar":
+        desconocidas = [c for c in args.colecciones if c not in COLECCIONES]
+        if desconocidas:
+            p_actualizar.error(f"colecciones desconocidas: {', '.join(desconocidas)} "
+                               f"(válidas: {', '.join(COLECCIONES)})")
+        args.colecciones = list(dict.fromkeys(args.colecciones)) or COLECCIONES
+    almacen = AlmacenSnapshots(formato=args.formato) if args.directorio is None \
+        else AlmacenSnapshots(args.directorio, args.formato)
+    args.funcion(args, almacen)
+
+
+if __name__ == "__main__":
+    main()
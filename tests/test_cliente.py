@@ -0,0 +1,50 @@
+import json
+import random
+
+import pytest
+
+from evaluapp.cliente import iterar_arreglo_json
+
+ELEMENTOS = [
+    1, -1500.0, 2.5e-3, 0, 12345678901234567890, True, False, None,
+    "texto con ] y , y \"comillas\"", "", "ñandú á",
+    {"id": 7, "puntaje": 65.5, "respuestas": {"1": 4, "2": 8}},
+    [], [1, [2, [3]]], {"a": [], "b": {}},
+]
+
+
+def _trocear(texto, rng):
+    cortes = sorted(rng.sample(range(1, len(texto)), rng.randint(1, min(30, len(texto) - 1))))
+    return [texto[i:j] for i, j in zip([0] + cortes, cortes + [len(texto)])]
+
+
+@pytest.mark.parametrize("separadores", [(",", ":"), (", ", ": ")])
+def test_cortes_aleatorios(separadores):
+    rng = random.Random(1)
+    texto = " " + json.dumps(ELEMENTOS, separators=separadores) + "\n"
+    for _ in range(500):
+        assert list(iterar_arreglo_json(_trocear(texto, rng))) == ELEMENTOS
+
+
+def test_numero_cortado_en_un_fragmento():
+    assert list(iterar_arreglo_json(["[1, -1500.", "0, 2]"])) == [1, -1500.0, 2]
+    assert list(iterar_arreglo_json(["[1", "2", "3]"])) == [123]
+    assert list(iterar_arreglo_json(["[", "-", "1e", "5", "]"])) == [-1e5]
+
+
+def test_un_caracter_por_fragmento():
+    texto = json.dumps(ELEMENTOS)
+    assert list(iterar_arreglo_json(iter(texto))) == ELEMENTOS
+
+
+@pytest.mark.parametrize("texto", ["[]", " [ ] ", "[\n]"])
+def test_arreglo_vacio(texto):
+    assert list(iterar_arreglo_json([texto])) == []
+
+
+@pytest.mark.parametrize("texto", [
+    "[1,,2]", "[,1]", "[1 2]", "[1]x", "[1,]", "[1", "[1,", "{}", "1", "", '["abierto]',
+])
+def test_mal_formado(texto):
+    with pytest.raises(ValueError):
+        list(iterar_arreglo_json([texto]))
@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from evaluapp.envios import CABECERA_IDEMPOTENCIA, CONFIRMADO, FALLIDO, PENDIENTE, ColaEnvios
+
+
+class Respuesta:
+    def __init__(self, status_code, text="{}"):
+        self.status_code = status_code
+        self.text = text
+
+
+class ClienteFalso:
+    # Cuenta los POST por clave de idempotencia
+    def __init__(self, status_code=201, espera=0.002):
+        self.status_code = status_code
+        self.espera = espera
+        self.envios = Counter()
+        self._lock = threading.Lock()
+
+    def post(self, endpoint, json=None, headers=None):
+        time.sleep(self.espera)
+        with self._lock:
+            self.envios[headers[CABECERA_IDEMPOTENCIA]] += 1
+        return Respuesta(self.status_code)
+
+
+def test_dos_colas_sobre_la_misma_base_envian_cada_uno_una_vez(tmp_path):
+    ruta = str(tmp_path / "envios.sqlite3")
+    cliente = ClienteFalso()
+    colas = [ColaEnvios(ruta, cliente=cliente, max_concurrencia=4) for _ in range(2)]
+    claves = [colas[i % 2].encolar("resultados", {"examenId": 1, "n": i}) for i in range(300)]
+
+    def vaciar(cola):
+        while cola.vaciar(limite=20):
+            pass
+
+    with ThreadPoolExecutor(max_workers=len(colas)) as executor:
+        for futuro in [executor.submit(vaciar, cola) for cola in colas]:
+            futuro.result()
+
+    assert cliente.envios == Counter(claves)
+    assert colas[0].resumen() == {CONFIRMADO: len(claves)}
+
+
+def test_reintenta_los_errores_temporales_y_no_los_definitivos(tmp_path):
+    ruta = str(tmp_path / "envios.sqlite3")
+    cola = ColaEnvios(ruta, cliente=ClienteFalso(status_code=503, espera=0))
+    clave = cola.encolar("resultados", {"examenId": 1})
+    assert cola.vaciar() == {PENDIENTE: 1}
+    envio = cola.estado(clave)
+    assert envio["intentos"] == 1 and envio["proximo_intento"] > time.time()
+    # No se vuelve a tomar hasta que pase la espera
+    assert cola.vaciar() == {}
+
+    cola = ColaEnvios(ruta, cliente=ClienteFalso(status_code=400, espera=0))
+    clave = cola.encolar("resultados", {})
+    assert cola.vaciar() == {FALLIDO: 1}
+    assert cola.estado(clave)["ultimo_error"].startswith("HTTP 400")
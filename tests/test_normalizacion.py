@@ -0,0 +1,52 @@
+import pytest
+
+from evaluapp.normalizacion import ESQUEMAS, _lista_enteros, normalizar, normalizar_respuesta
+
+
+def test_convierte_los_campos():
+    registros = [
+        {"id": "3", "preguntasIds": ["1", 2, 3.0], "creadorId": 5.0, "titulo": "Examen"},
+        {"id": 4, "preguntasIds": None},
+        {"id": 5},
+    ]
+    validos, invalidos = normalizar(registros, ESQUEMAS["examen"])
+    assert invalidos == []
+    assert validos[0] == {"id": 3, "preguntasIds": [1, 2, 3], "creadorId": 5, "titulo": "Examen"}
+    assert validos[1]["preguntasIds"] == [] and validos[2]["preguntasIds"] == []
+    assert "creadorId" not in validos[2]
+    # Se convierten en el sitio, sin copiar los registros
+    assert validos[0] is registros[0]
+
+
+def test_booleanos_y_numeros():
+    registros = [{"id": 1, "esCorrecta": "true"}, {"id": 2, "esCorrecta": 0}, {"id": 3, "esCorrecta": " FALSE "}]
+    validos, _ = normalizar(registros, ESQUEMAS["opcion"])
+    assert [r["esCorrecta"] for r in validos] == [True, False, False]
+    validos, _ = normalizar([{"id": 1, "puntaje": "65.5"}, {"id": 2, "puntaje": 70}], ESQUEMAS["resultado"])
+    assert [r["puntaje"] for r in validos] == [65.5, 70]
+
+
+def test_informa_los_invalidos():
+    registros = [{"id": "x"}, "texto", {"titulo": "sin id"}, {"id": 2, "preguntasIds": "1,2"}, {"id": 1.5}, {"id": 7}]
+    validos, invalidos = normalizar(registros, ESQUEMAS["examen"])
+    assert [r["id"] for r in validos] == [7]
+    assert [(i["indice"], i["id"]) for i in invalidos] == [(0, "x"), (1, None), (2, None), (3, 2), (4, 1.5)]
+    assert invalidos[2]["motivo"] == "falta id"
+    assert invalidos[3]["motivo"].startswith("preguntasIds")
+
+
+def test_lista_enteros_con_las_reglas_de_un_id():
+    lista = [1, 2, 3]
+    assert _lista_enteros(lista) is lista
+    assert _lista_enteros(["1", 2.0]) == [1, 2]
+    for valor in ([1, 1.9], [True], [1, None], ["a"]):
+        with pytest.raises(ValueError):
+            _lista_enteros(valor)
+
+
+def test_normalizar_respuesta():
+    assert normalizar_respuesta("examenes", None) == ([], [])
+    assert normalizar_respuesta("teacher/profile", {"id": "1"}) == ({"id": "1"}, [])
+    validos, invalidos = normalizar_respuesta("opciones/pregunta/12", [{"id": "1", "preguntaId": "12"}, {}])
+    assert validos == [{"id": 1, "preguntaId": 12}]
+    assert len(invalidos) == 1
@@ -0,0 +1,33 @@
+import pandas as pd
+
+import evaluapp.paralelo
+from evaluapp.puntuacion import calcular
+from evaluapp.sintetico import generar_datos
+from evaluapp.tablas import tabla_resultados
+
+
+def _datos():
+    datos = generar_datos(examenes=8, preguntas=80, resultados=600, usuarios=50, preguntas_por_examen=10)
+    opciones = pd.DataFrame([dict(o, pregunta_id=pregunta_id)
+                             for pregunta_id, lista in datos["opciones"].items() for o in lista])
+    return tabla_resultados(datos["resultados"]), opciones
+
+
+def test_puntajes_iguales_a_los_del_servidor():
+    resultados, opciones = _datos()
+    puntuacion = calcular(resultados, opciones)
+    assert len(puntuacion.intentos) == len(resultados)
+    puntajes = resultados.set_index("id")["puntaje"]
+    pd.testing.assert_series_equal(puntuacion.intentos["puntaje"].round(2), puntajes.loc[puntuacion.intentos.index],
+                                   check_names=False, check_index_type=False)
+    assert puntuacion.distribucion.sum() == len(resultados)
+
+
+def test_en_serie_igual_que_por_particiones(monkeypatch):
+    resultados, opciones = _datos()
+    serie = calcular(resultados, opciones, procesos=1)
+    monkeypatch.setattr(evaluapp.paralelo, "MIN_FILAS", 0)
+    particiones = calcular(resultados, opciones, procesos=2)
+    pd.testing.assert_frame_equal(serie.intentos, particiones.intentos)
+    pd.testing.assert_frame_equal(serie.preguntas, particiones.preguntas)
+    pd.testing.assert_series_equal(serie.distribucion, particiones.distribucion)